@@ -17,8 +17,11 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-from src.model_utils import load_model, predict_ranking, get_feature_importance
-from src.utils import load_data, format_probability, calculate_metrics_summary, get_status_color
+from src.change_feed import ServingState
+from src.model_utils import (get_candidate_rows, get_vaga_rows, get_feature_importance,
+                             top_vagas_for_candidate)
+from src.model_registry import REGISTRY_DIR, get_watcher
+from src.utils import load_data, calculate_metrics_summary, get_status_color
 
 # ---------------------------------
 # Configuração da página
@@ -48,162 +51,245 @@ MODEL_PATH = ROOT / "models" / "model_lgbm.pkl"
 # ---------------------------------
 # Cache dos dados e do modelo
 # ---------------------------------
+PAGE_SIZES = [25, 50, 100]
+STATUS_MAP = {2: "📋 Encaminhado", 3: "🎤 Entrevista",
+              4: "✅ Aprovado", 5: "🎉 Contratado", 6: "❌ Reprovado"}
+RANKING_COLS = [
+    "codigo_candidato", "vaga_id", "situacao_ord",
+    "tech_overlap_count", "ingles_ok", "senioridade_ok",
+    "cand_has_sap", "days_update",
+]
+TOP_K_VAGAS = [5, 10, 20]
+
 @st.cache_data(show_spinner="Carregando dataset…")
 def load_cached_data(path: Path) -> pd.DataFrame:
     return load_data(path)
 
-@st.cache_resource(show_spinner="Carregando modelo…")
-def load_cached_model(path: Path):
-    return load_model(path)
+@st.cache_resource(max_entries=2, show_spinner="Calculando ranking…")
+def load_serving_state(data_path: str, version: str, _df: pd.DataFrame, _model) -> ServingState:
+    # score de todos os pares uma única vez por (dataset, versão do modelo), usando o
+    # snapshot do change feed quando existir; max_entries=2 descarta versões antigas
+    return ServingState.load(_df, _model, version)
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def get_vaga_ranking(vaga_id, filtros: tuple, version: str, state_token: str, revision: int,
+                     _df: pd.DataFrame, _index: dict) -> pd.DataFrame:
+    # ranking filtrado de uma vaga; chave = (vaga, filtros, versão do modelo,
+    # instância do estado servido, revisão da vaga no change feed)
+    ingles, senioridade, sap, min_tech = filtros
+    rows = get_vaga_rows(_index, vaga_id)
+    df_vaga = _df.iloc[rows]
+    mask = np.ones(len(df_vaga), dtype=bool)
+    if ingles:
+        mask &= df_vaga["ingles_ok"].to_numpy() == 1
+    if senioridade:
+        mask &= df_vaga["senioridade_ok"].to_numpy() == 1
+    if sap:
+        mask &= df_vaga["cand_has_sap"].to_numpy() == 1
+    if min_tech > 0:
+        mask &= df_vaga["tech_overlap_count"].to_numpy() >= min_tech
+
+    cols_keep = [c for c in RANKING_COLS if c in _df.columns]
+    df_ranking = df_vaga.loc[mask, cols_keep].copy()
+    df_ranking["probabilidade_contratacao"] = _index["scores"][rows[mask]]
+    return df_ranking.reset_index(drop=True)
 
 # ---------------------------------
 # Carregar dados e modelo
 # ---------------------------------
 try:
     df = load_cached_data(DATA_PATH)
-    model = load_cached_model(MODEL_PATH)
+    # modelo promovido no registry (ou o legado); o watcher troca em background
+    watcher = get_watcher(REGISTRY_DIR, fallback_path=MODEL_PATH)
+    model, versao_modelo = watcher.get()
+    serving = load_serving_state(str(DATA_PATH), versao_modelo, df, model)
     st.sidebar.success("✅ Modelo e dados carregados")
 except Exception as e:
     st.error(f"❌ Erro ao carregar dados/modelo: {e}")
     st.stop()
 
 # ---------------------------------
-# Sidebar – Filtros
+# Sidebar – Vaga
 # ---------------------------------
 st.sidebar.title("🔧 Filtros")
 st.sidebar.markdown("---")
 
-vagas_disponiveis = sorted(df["vaga_id"].unique())
+vagas_disponiveis = sorted(serving.df["vaga_id"].unique())
 vaga_selecionada = st.sidebar.selectbox(
     "🎯 Selecionar Vaga",
     vagas_disponiveis,
     help="Escolha uma vaga para ver o ranking de candidatos",
 )
+st.sidebar.caption(f"Modelo: `{versao_modelo}`")
 
-st.sidebar.markdown("### 🎓 Filtros de Qualificação")
-filtro_ingles = st.sidebar.checkbox("✅ Inglês OK", value=False)
-filtro_senioridade = st.sidebar.checkbox("✅ Senioridade OK", value=False)
-filtro_sap = st.sidebar.checkbox("🔶 Conhecimento SAP", value=False)
-
-min_tech_overlap = st.sidebar.slider(
-    "🔧 Mínimo Match Técnico",
-    min_value=0,
-    max_value=20,
-    value=0,
-    help="Número mínimo de tecnologias em comum",
-)
-
-# ---------------------------------
-# Aplicar filtros
-# ---------------------------------
-df_filtrado = df[df["vaga_id"] == vaga_selecionada].copy()
+@st.fragment(run_every=10)
+def watch_model_version():
+    # nova versão promovida: reexecuta o app; os caches são chaveados pela versão
+    if watcher.version != versao_modelo:
+        st.rerun()
+    # eventos novos no change feed: pares afetados já foram recalculados
+    if serving.poll() > 0:
+        st.rerun()
 
-if filtro_ingles:
-    df_filtrado = df_filtrado[df_filtrado["ingles_ok"] == 1]
-if filtro_senioridade:
-    df_filtrado = df_filtrado[df_filtrado["senioridade_ok"] == 1]
-if filtro_sap:
-    df_filtrado = df_filtrado[df_filtrado["cand_has_sap"] == 1]
-if min_tech_overlap > 0:
-    df_filtrado = df_filtrado[df_filtrado["tech_overlap_count"] >= min_tech_overlap]
+with st.sidebar:
+    watch_model_version()
 
 # ---------------------------------
-# Métricas da vaga
+# Fragmentos de ranking
 # ---------------------------------
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("📋 Vaga Selecionada", str(vaga_selecionada))
-with col2:
-    st.metric("👥 Candidatos Filtrados", len(df_filtrado))
-with col3:
-    if len(df_filtrado) > 0:
-        contratados = (df_filtrado["situacao_ord"] == 5).sum()
-        st.metric("✅ Taxa Sucesso Histórica", f"{contratados / len(df_filtrado) * 100:.1f}%")
-
-# ---------------------------------
-# Ranking de candidatos
-# ---------------------------------
-if len(df_filtrado) > 0:
-    st.markdown("---")
-    st.subheader("🏆 Ranking de Candidatos - IA")
-
-    # Preparar features (remove colunas não preditoras)
-    drop_cols = ["vaga_id", "codigo_candidato", "situacao_ord"]
-    X = df_filtrado.drop(columns=[c for c in drop_cols if c in df_filtrado.columns])
-
-    # Reordenar/alinhar colunas se o modelo expõe feature_names_in_
-    if hasattr(model, "feature_names_in_"):
-        X = X.reindex(columns=model.feature_names_in_, fill_value=0)
-
-    try:
-        probabilidades = predict_ranking(model, X)
-    except Exception as e:
-        st.error(f"Erro ao gerar predições: {e}")
-        st.stop()
-
-    # Montar ranking
-    cols_keep = [
-        "codigo_candidato", "vaga_id", "situacao_ord",
+def render_top10(df_ranking: pd.DataFrame):
+    # uma única tabela no lugar de cartões com st.columns por candidato
+    top = df_ranking.head(10)
+    tech = top["tech_overlap_count"].astype(int)
+    badges = (
+        top["ingles_ok"].eq(1).map({True: "🇺🇸 Inglês OK  ", False: ""})
+        + top["senioridade_ok"].eq(1).map({True: "🎓 Senioridade OK  ", False: ""})
+        + top["cand_has_sap"].eq(1).map({True: "🔶 SAP  ", False: ""})
+        + ("🔧 Tech: " + tech.astype(str)).where(tech > 0, "")
+    )
+    days = top["days_update"].astype(int)
+    df_top = pd.DataFrame({
+        "#": np.arange(1, len(top) + 1),
+        "Candidato": top["codigo_candidato"].astype(str),
+        "Prob. Contratação": top["probabilidade_contratacao"] * 100,
+        "Status": top["situacao_ord"].astype(int).map(STATUS_MAP).fillna("❓ Desconhecido"),
+        "Badges": badges,
+        "Atualização": ("⏱️ " + days.astype(str) + " dias").where(days > 0, "🆕 Novo"),
+    })
+    st.dataframe(
+        df_top,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Prob. Contratação": st.column_config.ProgressColumn(
+                "🎯 Prob. Contratação", format="%.1f%%", min_value=0, max_value=100,
+            ),
+        },
+    )
+
+@st.fragment
+def render_full_table(df_ranking: pd.DataFrame, vaga_id):
+    # tabela paginada no servidor: só a página visível vai para o navegador
+    mostrar_cols = [
+        "codigo_candidato", "probabilidade_contratacao",
         "tech_overlap_count", "ingles_ok", "senioridade_ok",
         "cand_has_sap", "days_update",
     ]
-    cols_keep = [c for c in cols_keep if c in df_filtrado.columns]
-
-    df_ranking = df_filtrado[cols_keep].copy()
-    df_ranking["probabilidade_contratacao"] = probabilidades
-    df_ranking = df_ranking.sort_values("probabilidade_contratacao", ascending=False)
+    mostrar_cols = [c for c in mostrar_cols if c in df_ranking.columns]
+
+    c1, c2 = st.columns([1, 3])
+    with c1:
+        page_size = st.selectbox("Linhas por página", PAGE_SIZES, key=f"page_size_{vaga_id}")
+    n_pages = max(1, -(-len(df_ranking) // page_size))
+    with c2:
+        page = st.number_input(
+            f"Página (de {n_pages})", min_value=1, max_value=n_pages, value=1, step=1,
+            key=f"page_{vaga_id}_{page_size}",
+        )
+    start = (int(page) - 1) * page_size
+    df_page = df_ranking.iloc[start:start + page_size][mostrar_cols]
+    df_page.index = np.arange(start + 1, start + 1 + len(df_page))
+    st.dataframe(df_page, use_container_width=True)
+    st.caption(f"Exibindo {start + 1}–{start + len(df_page)} de {len(df_ranking)} candidatos")
+
+@st.fragment
+def render_ranking(vaga_id):
+    # filtros dentro do fragmento: alterar um filtro reexecuta só este bloco
+    st.markdown("### 🎓 Filtros de Qualificação")
+    f1, f2, f3, f4 = st.columns(4)
+    with f1:
+        filtro_ingles = st.checkbox("✅ Inglês OK", value=False)
+    with f2:
+        filtro_senioridade = st.checkbox("✅ Senioridade OK", value=False)
+    with f3:
+        filtro_sap = st.checkbox("🔶 Conhecimento SAP", value=False)
+    with f4:
+        min_tech_overlap = st.slider(
+            "🔧 Mínimo Match Técnico",
+            min_value=0,
+            max_value=20,
+            value=0,
+            help="Número mínimo de tecnologias em comum",
+        )
+
+    filtros = (filtro_ingles, filtro_senioridade, filtro_sap, min_tech_overlap)
+    with serving.lock:
+        df_ranking = get_vaga_ranking(vaga_id, filtros, versao_modelo, serving.token,
+                                      serving.revision(vaga_id), serving.df, serving.index)
+
+    # Métricas da vaga
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📋 Vaga Selecionada", str(vaga_id))
+    with col2:
+        st.metric("👥 Candidatos Filtrados", len(df_ranking))
+    with col3:
+        if len(df_ranking) > 0:
+            contratados = (df_ranking["situacao_ord"] == 5).sum()
+            st.metric("✅ Taxa Sucesso Histórica", f"{contratados / len(df_ranking) * 100:.1f}%")
+
+    if len(df_ranking) == 0:
+        st.warning("⚠️ Nenhum candidato encontrado com os filtros aplicados.")
+        return
 
-    # Top 10 com cartões
+    st.markdown("---")
+    st.subheader("🏆 Ranking de Candidatos - IA")
     st.markdown("### 🥇 Top 10 Candidatos Recomendados")
-    for idx, (_, cand) in enumerate(df_ranking.head(10).iterrows(), start=1):
-        with st.container():
-            c1, c2, c3, c4 = st.columns([1, 2, 2, 1])
-
-            with c1:
-                st.markdown(f"**#{idx}**")
-                st.markdown(f"🆔 {cand['codigo_candidato']}")
-
-            with c2:
-                prob_fmt = format_probability(cand["probabilidade_contratacao"])
-                st.markdown(f"**🎯 Prob. Contratação: {prob_fmt}**")
-
-                status_map = {2: "📋 Encaminhado", 3: "🎤 Entrevista",
-                              4: "✅ Aprovado", 5: "🎉 Contratado", 6: "❌ Reprovado"}
-                status = status_map.get(int(cand.get("situacao_ord", -1)), "❓ Desconhecido")
-                st.markdown(f"Status: {status}")
-
-            with c3:
-                badges = []
-                if cand.get("ingles_ok", 0) == 1:
-                    badges.append("🇺🇸 Inglês OK")
-                if cand.get("senioridade_ok", 0) == 1:
-                    badges.append("🎓 Senioridade OK")
-                if cand.get("cand_has_sap", 0) == 1:
-                    badges.append("🔶 SAP")
-                if cand.get("tech_overlap_count", 0) > 0:
-                    badges.append(f"🔧 Tech: {int(cand['tech_overlap_count'])}")
-
-                for b in badges:
-                    st.markdown(f"`{b}`")
-
-            with c4:
-                days = int(cand.get("days_update", 0))
-                st.markdown(f"⏱️ {days} dias" if days > 0 else "🆕 Novo")
-
-            st.markdown("---")
+    render_top10(df_ranking)
 
     # Tabela completa opcional
     if len(df_ranking) > 10:
-        if st.button(f"📋 Ver todos os {len(df_ranking)} candidatos"):
-            mostrar_cols = [
-                "codigo_candidato", "probabilidade_contratacao",
-                "tech_overlap_count", "ingles_ok", "senioridade_ok",
-                "cand_has_sap", "days_update",
-            ]
-            mostrar_cols = [c for c in mostrar_cols if c in df_ranking.columns]
-            st.dataframe(df_ranking[mostrar_cols], use_container_width=True)
-else:
-    st.warning("⚠️ Nenhum candidato encontrado com os filtros aplicados.")
+        if st.toggle(f"📋 Ver todos os {len(df_ranking)} candidatos", key=f"ver_todos_{vaga_id}"):
+            render_full_table(df_ranking, vaga_id)
+
+@st.fragment
+def render_candidate_lookup():
+    # busca reversa: top-k vagas do candidato direto do índice por candidato
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        candidato = st.text_input(
+            "👤 Código do Candidato",
+            help="Informe o codigo_candidato para ver as vagas mais aderentes",
+        ).strip()
+    with c2:
+        k = st.selectbox("Top-k vagas", TOP_K_VAGAS, index=1)
+
+    if not candidato:
+        st.info("Informe um código de candidato.")
+        return
+    with serving.lock:
+        if candidato not in serving.index["cand_pos"]:
+            st.warning(f"⚠️ Candidato {candidato} não encontrado.")
+            return
+        df_vagas = top_vagas_for_candidate(serving.index, serving.df, candidato, k)
+        n_vagas = len(get_candidate_rows(serving.index, candidato))
+
+    st.metric("📋 Vagas em que o candidato participa", n_vagas)
+    df_top = pd.DataFrame({
+        "#": np.arange(1, len(df_vagas) + 1),
+        "Vaga": df_vagas["vaga_id"].astype(str),
+        "Prob. Contratação": df_vagas["probabilidade_contratacao"] * 100,
+        "Status": df_vagas["situacao_ord"].astype(int).map(STATUS_MAP).fillna("❓ Desconhecido"),
+        "Match Técnico": df_vagas["tech_overlap_count"].astype(int),
+        "Inglês OK": df_vagas["ingles_ok"].eq(1),
+        "Senioridade OK": df_vagas["senioridade_ok"].eq(1),
+    })
+    st.dataframe(
+        df_top,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Prob. Contratação": st.column_config.ProgressColumn(
+                "🎯 Prob. Contratação", format="%.1f%%", min_value=0, max_value=100,
+            ),
+        },
+    )
+
+aba_vaga, aba_candidato = st.tabs(["🎯 Candidatos por vaga", "👤 Vagas por candidato"])
+with aba_vaga:
+    render_ranking(vaga_selecionada)
+with aba_candidato:
+    render_candidate_lookup()
 
 # ---------------------------------
 # Footer
@@ -0,0 +1,103 @@
+# streamlit/app/pages/02_📊_Analytics_Vagas.py
+import sys
+from pathlib import Path
+
+# --- Bootstrapping dos caminhos ---
+APP_DIR = Path(__file__).resolve().parent.parent  # .../streamlit/app
+ROOT    = APP_DIR.parent                          # .../streamlit
+SRC_DIR = ROOT / "src"
+
+for p in (str(ROOT), str(SRC_DIR)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from src.analytics import DIMENSIONS, STAGE_LABELS, get_cube, rollup, summarize_slice, vaga_funnel, vaga_table
+
+st.set_page_config(page_title="Decision AI - Analytics de Vagas", page_icon="📊", layout="wide")
+st.title("📊 Analytics de Vagas")
+
+DATA_PATH = ROOT / "data" / "df_clean.csv"
+DIM_NAMES = {"sap": "🔶 Vaga SAP", "senioridade": "🎓 Senioridade da vaga",
+             "ingles": "🇺🇸 Nível de inglês exigido", "tech": "🔧 Match técnico"}
+
+# ---------------------------------
+# Cubo pré-agregado (feature store)
+# ---------------------------------
+@st.cache_resource(show_spinner="Carregando cubo de analytics…")
+def load_cached_cube(path: str, fingerprint: str) -> dict:
+    return get_cube(path)
+
+try:
+    cube = load_cached_cube(str(DATA_PATH), str(DATA_PATH.stat().st_mtime_ns))
+except Exception as e:
+    st.error(f"❌ Erro ao carregar analytics: {e}")
+    st.stop()
+
+# ---------------------------------
+# Sidebar – Recortes
+# ---------------------------------
+st.sidebar.title("🔧 Recortes")
+filtros = {}
+for dim in DIMENSIONS:
+    labels = cube["labels"][dim]
+    escolhidos = st.sidebar.multiselect(DIM_NAMES[dim], labels, default=[])
+    if escolhidos:
+        filtros[dim] = [labels.index(x) for x in escolhidos]
+
+# ---------------------------------
+# Resumo do recorte
+# ---------------------------------
+resumo = summarize_slice(cube, **filtros)
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("📋 Vagas", f"{resumo['total_vagas']:,}".replace(",", "."))
+with col2:
+    st.metric("👥 Candidaturas", f"{resumo['total_candidatos']:,}".replace(",", "."))
+with col3:
+    st.metric("✅ Taxa de Contratação", f"{resumo['taxa_contratacao']:.1f}%")
+with col4:
+    st.metric("⏱️ Dias médios até atualização", f"{resumo['dias_medio']:.1f}")
+
+if resumo["total_candidatos"] == 0:
+    st.warning("⚠️ Nenhuma candidatura no recorte selecionado.")
+    st.stop()
+
+df_funil = pd.DataFrame({"etapa": STAGE_LABELS, "candidatos": resumo["funil"]})
+st.plotly_chart(px.bar(df_funil, x="etapa", y="candidatos", title="Distribuição no funil"),
+                use_container_width=True)
+
+# ---------------------------------
+# Quebra por dimensão
+# ---------------------------------
+st.markdown("---")
+dim_quebra = st.selectbox("📐 Quebrar por", list(DIMENSIONS), format_func=DIM_NAMES.get)
+df_quebra = rollup(cube, dim_quebra, **filtros)
+df_quebra = df_quebra[df_quebra["total"] > 0]
+
+c1, c2 = st.columns(2)
+with c1:
+    st.plotly_chart(px.bar(df_quebra, x=dim_quebra, y="taxa_contratacao",
+                           title="Taxa de contratação (%)"), use_container_width=True)
+with c2:
+    df_long = df_quebra.melt(id_vars=dim_quebra, value_vars=STAGE_LABELS,
+                             var_name="etapa", value_name="candidatos")
+    st.plotly_chart(px.bar(df_long, x=dim_quebra, y="candidatos", color="etapa",
+                           title="Etapas do funil"), use_container_width=True)
+
+# ---------------------------------
+# Drill-down por vaga
+# ---------------------------------
+st.markdown("---")
+st.subheader("🔎 Vagas do recorte")
+df_vagas = vaga_table(cube, **filtros).sort_values("total", ascending=False)
+st.dataframe(df_vagas.head(100), hide_index=True, use_container_width=True)
+
+vaga_sel = st.selectbox("🎯 Detalhar vaga", df_vagas["vaga_id"].head(100))
+if vaga_sel is not None:
+    df_vaga = pd.DataFrame({"etapa": STAGE_LABELS, "candidatos": vaga_funnel(cube, vaga_sel)})
+    st.plotly_chart(px.bar(df_vaga, x="etapa", y="candidatos", title=f"Funil da vaga {vaga_sel}"),
+                    use_container_width=True)
@@ -0,0 +1,96 @@
+# streamlit/app/pages/03_🔍_Insights_Modelo.py
+import sys
+from pathlib import Path
+
+# --- Bootstrapping dos caminhos ---
+APP_DIR = Path(__file__).resolve().parent.parent  # .../streamlit/app
+ROOT    = APP_DIR.parent                          # .../streamlit
+SRC_DIR = ROOT / "src"
+
+for p in (str(ROOT), str(SRC_DIR)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from src.insights import INTERACTION_PAIRS, get_insights
+from src.model_registry import REGISTRY_DIR, get_watcher
+from src.model_utils import get_feature_importance
+from src.utils import load_data
+
+st.set_page_config(page_title="Decision AI - Insights do Modelo", page_icon="🔍", layout="wide")
+st.title("🔍 Insights do Modelo")
+
+DATA_PATH  = ROOT / "data" / "df_clean.csv"
+MODEL_PATH = ROOT / "models" / "model_lgbm.pkl"
+
+# ---------------------------------
+# Cache dos dados, modelo e insights
+# ---------------------------------
+@st.cache_data(show_spinner="Carregando dataset…")
+def load_cached_data(path: Path) -> pd.DataFrame:
+    return load_data(path)
+
+@st.cache_resource(max_entries=8, show_spinner="Calculando dependência parcial…")
+def load_cached_insights(version: str, pairs: tuple, _model, _df: pd.DataFrame) -> dict:
+    # em disco por versão do modelo; só recalcula na primeira abertura
+    return get_insights(_model, version, _df, list(pairs))
+
+try:
+    df = load_cached_data(DATA_PATH)
+    model, versao_modelo = get_watcher(REGISTRY_DIR, fallback_path=MODEL_PATH).get()
+except Exception as e:
+    st.error(f"❌ Erro ao carregar dados/modelo: {e}")
+    st.stop()
+
+st.sidebar.caption(f"Modelo: `{versao_modelo}`")
+features = [str(f) for f in getattr(model, "feature_names_in_", [])]
+
+# ---------------------------------
+# Importância das features
+# ---------------------------------
+df_imp = get_feature_importance(model, features)
+if df_imp is not None:
+    st.subheader("📈 Importância das Features")
+    st.plotly_chart(px.bar(df_imp.head(15).iloc[::-1], x="importance", y="feature", orientation="h"),
+                    use_container_width=True)
+
+# ---------------------------------
+# Dependência parcial
+# ---------------------------------
+st.markdown("---")
+st.subheader("📉 Dependência Parcial")
+
+c1, c2 = st.columns(2)
+with c1:
+    f1 = st.selectbox("Feature", features, index=features.index("senioridade_gap") if "senioridade_gap" in features else 0)
+with c2:
+    opcoes_f2 = ["(nenhuma)"] + [f for f in features if f != f1]
+    padrao = dict(INTERACTION_PAIRS).get(f1, "(nenhuma)")
+    f2 = st.selectbox("Interação com", opcoes_f2,
+                      index=opcoes_f2.index(padrao) if padrao in opcoes_f2 else 0)
+
+pairs = list(INTERACTION_PAIRS)
+if f2 != "(nenhuma)" and (f1, f2) not in pairs:
+    pairs.append((f1, f2))
+insights = load_cached_insights(versao_modelo, tuple(pairs), model, df)
+st.caption(f"Amostra estratificada de {insights['n_sample']} pares vaga-candidato")
+
+curva = insights["partial_dependence"][f1]
+fig = go.Figure([
+    go.Scatter(x=curva["grid"], y=curva["p90"], line=dict(width=0), showlegend=False),
+    go.Scatter(x=curva["grid"], y=curva["p10"], fill="tonexty", line=dict(width=0), name="p10–p90"),
+    go.Scatter(x=curva["grid"], y=curva["mean"], mode="lines+markers", name="média"),
+])
+fig.update_layout(xaxis_title=f1, yaxis_title="Prob. contratação")
+st.plotly_chart(fig, use_container_width=True)
+
+if f2 != "(nenhuma)":
+    inter = insights["interactions"][(f1, f2)]
+    fig = px.imshow(inter["mean"], x=[f"{v:g}" for v in inter["grid2"]], y=[f"{v:g}" for v in inter["grid1"]],
+                    labels=dict(x=f2, y=f1, color="Prob. contratação"), aspect="auto",
+                    color_continuous_scale="Viridis", origin="lower")
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,164 @@
+# streamlit/src/analytics.py
+import numpy as np
+import pandas as pd
+
+from feature_store import data_fingerprint, load_artifact, save_artifact
+from utils import N_STAGES, _resolve, load_data, summarize_stage_counts
+
+CUBE_NAME = "analytics_cube"
+STAGE_LABELS = ["Cadastrado", "Contato", "Encaminhado", "Entrevista",
+                "Aprovado", "Contratado", "Reprovado"]
+TECH_BUCKETS = ["baixo", "medio", "alto"]   # mesmos cortes de evaluate_by_segments
+
+# dimensão -> (coluna de origem, rótulos dos níveis). "sap", "senioridade" e
+# "ingles" são atributos da vaga; "tech" é do par vaga-candidato.
+DIMENSIONS = {
+    "sap": ("is_sap_vaga", ["Não SAP", "SAP"]),
+    "senioridade": ("vaga_sen_rank", ["Não informada", "Júnior", "Pleno", "Sênior"]),
+    "ingles": ("vaga_ing_rank", [str(i) for i in range(8)]),
+    "tech": ("tech_overlap_count", TECH_BUCKETS),
+}
+VAGA_DIMS = ["sap", "senioridade", "ingles"]
+
+def tech_bucket(tech_overlap_count) -> np.ndarray:
+    t = np.asarray(tech_overlap_count)
+    return np.where(t == 0, 0, np.where(t <= 3, 1, 2)).astype(np.int64)
+
+def _dim_codes(df: pd.DataFrame, dim: str) -> np.ndarray:
+    col, labels = DIMENSIONS[dim]
+    if dim == "tech":
+        return tech_bucket(df[col])
+    return np.clip(df[col].fillna(0).astype(int).to_numpy(), 0, len(labels) - 1)
+
+def _group_counts(codes: np.ndarray, n_groups: int, stages: np.ndarray, days: np.ndarray) -> dict:
+    # contagens por etapa do funil e soma de days_update por entidade
+    flat = codes * N_STAGES + stages
+    counts = np.bincount(flat, minlength=n_groups * N_STAGES).reshape(n_groups, N_STAGES)
+    days_sum = np.bincount(codes, weights=days, minlength=n_groups)
+    return {"counts": counts.astype(np.int32), "days_sum": days_sum}
+
+def build_cube(df: pd.DataFrame) -> dict:
+    """Pré-agrega o funil (contagens e somas) sobre as dimensões de análise."""
+    dims = list(DIMENSIONS)
+    shape = tuple(len(DIMENSIONS[d][1]) for d in dims)
+    stages = np.clip(df["situacao_ord"].fillna(2).astype(int).to_numpy(), 0, N_STAGES - 1)
+    days = df["days_update"].fillna(0).to_numpy(dtype=np.float64)
+    codes = [_dim_codes(df, d) for d in dims]
+
+    # cubo denso: dimensões × etapa do funil
+    cell = np.ravel_multi_index(codes, shape)
+    counts = np.bincount(cell * N_STAGES + stages, minlength=int(np.prod(shape)) * N_STAGES)
+    days_sum = np.bincount(cell, weights=days, minlength=int(np.prod(shape)))
+
+    # por vaga: atributos da vaga e máscara das faixas tech presentes nos seus pares
+    vaga_codes, vaga_ids = pd.factorize(df["vaga_id"].astype(str), sort=True)
+    first = pd.Series(np.arange(len(df))).groupby(vaga_codes).first().to_numpy()
+    vaga_attrs = np.stack([codes[dims.index(d)][first] for d in VAGA_DIMS], axis=1)
+    tech_mask = np.zeros(len(vaga_ids), dtype=np.int64)
+    np.bitwise_or.at(tech_mask, vaga_codes, 1 << codes[dims.index("tech")])
+
+    # nº de vagas por célula (atributos × máscara tech): aditivo, sem dupla contagem
+    n_masks = 1 << len(TECH_BUCKETS)
+    vaga_shape = tuple(len(DIMENSIONS[d][1]) for d in VAGA_DIMS) + (n_masks,)
+    vaga_cell = np.ravel_multi_index(list(vaga_attrs.T) + [tech_mask], vaga_shape)
+    vagas = np.bincount(vaga_cell, minlength=int(np.prod(vaga_shape))).reshape(vaga_shape)
+
+    por_vaga = _group_counts(vaga_codes, len(vaga_ids), stages, days)
+    por_vaga.update({"labels": np.asarray(vaga_ids), "attrs": vaga_attrs.astype(np.int8),
+                     "tech_mask": tech_mask.astype(np.int8)})
+
+    cube = {
+        "dims": dims,
+        "labels": {d: DIMENSIONS[d][1] for d in dims},
+        "counts": counts.reshape(shape + (N_STAGES,)).astype(np.int32),
+        "days_sum": days_sum.reshape(shape),
+        "vagas": vagas.astype(np.int32),
+        "por_vaga": por_vaga,
+    }
+    if "informacoes_basicas.cliente" in df.columns:
+        cli_codes, clientes = pd.factorize(df["informacoes_basicas.cliente"].astype(str), sort=True)
+        cube["por_cliente"] = _group_counts(cli_codes, len(clientes), stages, days)
+        cube["por_cliente"]["labels"] = np.asarray(clientes)
+    return cube
+
+def get_cube(data_path) -> dict:
+    """Lê o cubo do feature store; reconstrói se o dataset de origem mudou."""
+    path = _resolve(data_path)
+    fingerprint = data_fingerprint(path)
+    cube = load_artifact(CUBE_NAME, meta=fingerprint)
+    if cube is None:
+        cube = build_cube(load_data(path))
+        save_artifact(CUBE_NAME, cube, meta=fingerprint)
+    return cube
+
+def _take(arr: np.ndarray, dims, filters: dict) -> np.ndarray:
+    # filters: dimensão -> nível ou lista de níveis; dimensão ausente = todos
+    for axis, d in enumerate(dims):
+        sel = filters.get(d)
+        if sel is not None:
+            arr = np.take(arr, np.atleast_1d(sel), axis=axis)
+    return arr
+
+def _tech_bits(filters: dict) -> int:
+    sel = filters.get("tech")
+    if sel is None:
+        return (1 << len(TECH_BUCKETS)) - 1
+    return sum(1 << int(t) for t in np.atleast_1d(sel))
+
+def slice_counts(cube: dict, **filters) -> np.ndarray:
+    sub = _take(cube["counts"], cube["dims"], filters)
+    return sub.reshape(-1, N_STAGES).sum(axis=0)
+
+def slice_vagas(cube: dict, **filters) -> int:
+    sub = _take(cube["vagas"], VAGA_DIMS, filters)
+    keep = (np.arange(sub.shape[-1]) & _tech_bits(filters)) != 0
+    return int(sub[..., keep].sum())
+
+def summarize_slice(cube: dict, **filters) -> dict:
+    summary = summarize_stage_counts(slice_counts(cube, **filters), slice_vagas(cube, **filters))
+    days = _take(cube["days_sum"], cube["dims"], filters).sum()
+    total = summary["total_candidatos"]
+    summary["dias_medio"] = days / total if total else 0.0
+    return summary
+
+def rollup(cube: dict, by: str, **filters) -> pd.DataFrame:
+    """Funil e taxa de contratação por nível de uma dimensão (demais filtradas)."""
+    axis = cube["dims"].index(by)
+    sub = np.moveaxis(_take(cube["counts"], cube["dims"], filters), axis, 0)
+    stage_counts = sub.reshape(sub.shape[0], -1, N_STAGES).sum(axis=1)
+
+    labels = np.asarray(cube["labels"][by])
+    if filters.get(by) is not None:
+        labels = labels[np.atleast_1d(filters[by])]
+
+    out = pd.DataFrame(stage_counts, columns=STAGE_LABELS)
+    out.insert(0, by, labels)
+    out["total"] = stage_counts.sum(axis=1)
+    out["taxa_contratacao"] = np.divide(stage_counts[:, 5] * 100, out["total"],
+                                        out=np.zeros(len(out)), where=out["total"] > 0)
+    return out
+
+def vaga_table(cube: dict, **filters) -> pd.DataFrame:
+    """Totais por vaga, restritos às vagas que atendem os filtros."""
+    pv = cube["por_vaga"]
+    mask = (pv["tech_mask"].astype(np.int64) & _tech_bits(filters)) != 0
+    for j, d in enumerate(VAGA_DIMS):
+        if filters.get(d) is not None:
+            mask &= np.isin(pv["attrs"][:, j], np.atleast_1d(filters[d]))
+
+    counts = pv["counts"][mask]
+    total = counts.sum(axis=1)
+    return pd.DataFrame({
+        "vaga_id": pv["labels"][mask],
+        "total": total,
+        "contratados": counts[:, 5],
+        "taxa_contratacao": np.divide(counts[:, 5] * 100, total, out=np.zeros(len(total)), where=total > 0),
+        "dias_medio": np.divide(pv["days_sum"][mask], total, out=np.zeros(len(total)), where=total > 0),
+    })
+
+def vaga_funnel(cube: dict, vaga_id) -> np.ndarray:
+    pv = cube["por_vaga"]
+    pos = np.searchsorted(pv["labels"], str(vaga_id))
+    if pos >= len(pv["labels"]) or pv["labels"][pos] != str(vaga_id):
+        return np.zeros(N_STAGES, dtype=np.int32)
+    return pv["counts"][pos]
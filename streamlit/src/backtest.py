@@ -0,0 +1,182 @@
+"""
+Módulo de backtest temporal para o projeto Decision AI.
+Rolling origin por mês de data_candidatura: treina com os meses <= t e testa
+no mês seguinte, fatiando por índice um único Dataset binado do LightGBM.
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from joblib import Parallel, delayed
+from sklearn.metrics import roc_auc_score, average_precision_score
+
+DATE_COL = "dt_cand"
+PARAMS = {
+    "objective": "binary",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "seed": 42,
+    "verbose": -1,
+    # sem escolha automática row/col-wise por tempo: resultados iguais entre máquinas
+    "force_row_wise": True,
+    "deterministic": True,
+}
+SCRATCH_ROUNDS = 200
+WARM_ROUNDS = 50
+CHAIN_LENGTH = 4  # janelas por cadeia de warm start; fixo para a tabela não depender da máquina
+
+def build_binned_dataset(df, date_col=DATE_COL, params=PARAMS):
+    """Ordena por data e constrói o Dataset binado uma única vez.
+
+    Retorna (Dataset completo, matriz de features, rótulos, mês de cada linha).
+    As janelas são fatias contíguas de linhas e herdam os bins do Dataset completo.
+    """
+    df = df[df[date_col].notna()].sort_values(date_col, kind="stable")
+    X = df.drop(columns=["vaga_id", "codigo_candidato", "situacao_ord", date_col])
+    y = (df["situacao_ord"] == 5).astype(int).to_numpy()
+    months = df[date_col].dt.to_period("M").to_numpy()
+
+    full = lgb.Dataset(X.to_numpy(dtype=np.float64), y, feature_name=list(X.columns),
+                       params=params, free_raw_data=False).construct()
+    return full, full.get_data(), y, months
+
+def monthly_windows(months, min_train_months=3, max_train_months=None):
+    """Janelas rolling origin como intervalos de linhas [início, fim) sobre dados ordenados.
+
+    Teste = cada mês a partir do (min_train_months + 1)-ésimo; treino = meses anteriores
+    (todos, ou os últimos max_train_months para janela deslizante).
+    """
+    uniq, starts = np.unique(months, return_index=True)
+    ends = np.append(starts[1:], len(months))
+    windows = []
+    for i in range(min_train_months, len(uniq)):
+        lo = 0 if max_train_months is None else max(0, i - max_train_months)
+        windows.append({
+            "treino_de": str(uniq[lo]),
+            "treino_ate": str(uniq[i - 1]),
+            "mes_teste": str(uniq[i]),
+            "train": (int(starts[lo]), int(starts[i])),
+            "test": (int(starts[i]), int(ends[i])),
+        })
+    return windows
+
+def _fit_window(full, X, y, window, prev=None, stop=None, params=PARAMS,
+                scratch_rounds=SCRATCH_ROUNDS, warm_rounds=WARM_ROUNDS):
+    # warm start só vale se o treino anterior estiver contido no atual (janela expansível);
+    # stop: até qual linha manter o score bruto (fim da cadeia); None = só o teste
+    (a, b), (c, d) = window["train"], window["test"]
+    warm = prev is not None and prev["train"][0] == a and prev["train"][1] <= b
+
+    t0 = time.perf_counter()
+    train_set = full.subset(np.arange(a, b)).construct()
+    raw = prev["raw"].copy() if warm else np.zeros(len(X))
+    if warm:
+        # continua do score bruto acumulado da cadeia (fatiado por índice): só as
+        # árvores novas são treinadas e somadas, sem repontuar as anteriores
+        train_set.set_init_score(raw[a:b])
+        booster = lgb.train(params, train_set, num_boost_round=warm_rounds)
+        n_trees = prev["n_arvores"] + booster.num_trees()
+    else:
+        booster = lgb.train(params, train_set, num_boost_round=scratch_rounds)
+        n_trees = booster.num_trees()
+    lo, hi = (c, d) if stop is None else (a, stop)
+    raw[lo:hi] += booster.predict(X[lo:hi], raw_score=True)
+    fit_s = time.perf_counter() - t0
+
+    y_test = y[c:d]
+    p = 1 / (1 + np.exp(-raw[c:d]))
+    has_both = 0 < y_test.sum() < len(y_test)
+    result = {
+        "treino_de": window["treino_de"],
+        "treino_ate": window["treino_ate"],
+        "mes_teste": window["mes_teste"],
+        "n_treino": b - a,
+        "n_teste": d - c,
+        "positivos_teste": int(y_test.sum()),
+        "warm_start": warm,
+        "n_arvores": n_trees,
+        "auc": roc_auc_score(y_test, p) if has_both else np.nan,
+        "ap": average_precision_score(y_test, p) if has_both else np.nan,
+        "tempo_s": fit_s,
+    }
+    return result, {"raw": raw, "train": window["train"], "n_arvores": n_trees}
+
+def _run_chain(full, X, y, windows, warm_start, params, scratch_rounds, warm_rounds):
+    # janelas consecutivas de uma mesma cadeia: cada uma parte do estado da anterior
+    rows, prev = [], None
+    stop = windows[-1]["test"][1] if warm_start else None
+    for w in windows:
+        a, b = w["train"]
+        if y[a:b].sum() == 0:
+            continue  # sem positivos no treino, não há modelo para a janela
+        row, state = _fit_window(full, X, y, w, prev if warm_start else None, stop,
+                                 params, scratch_rounds, warm_rounds)
+        rows.append(row)
+        prev = state
+    return rows
+
+def run_backtest(df, date_col=DATE_COL, min_train_months=3, max_train_months=None,
+                 warm_start=True, chain_length=CHAIN_LENGTH, n_jobs=-1, params=PARAMS,
+                 scratch_rounds=SCRATCH_ROUNDS, warm_rounds=WARM_ROUNDS):
+    """Backtest rolling origin mensal; retorna uma linha de métricas por janela.
+
+    As janelas são agrupadas em cadeias contíguas de chain_length janelas: a
+    primeira de cada cadeia treina do zero e as seguintes fazem warm start a
+    partir da anterior. n_jobs só distribui as cadeias entre threads (o LightGBM
+    libera o GIL), então o resultado não depende do número de núcleos.
+    Com max_train_months (janela deslizante) não há warm start.
+    """
+    full, X, y, months = build_binned_dataset(df, date_col, params)
+    windows = monthly_windows(months, min_train_months, max_train_months)
+    if not windows:
+        raise ValueError(f"São necessários mais de {min_train_months} meses em {date_col}")
+
+    chains = [windows[i:i + chain_length] for i in range(0, len(windows), chain_length)]
+    n_jobs = min(len(chains), os.cpu_count() if n_jobs == -1 else n_jobs)
+    params = {**params, "num_threads": max(1, (os.cpu_count() or 1) // n_jobs)}
+    results = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_run_chain)(full, X, y, chain, warm_start, params, scratch_rounds, warm_rounds)
+        for chain in chains
+    )
+    return pd.DataFrame([row for rows in results for row in rows])
+
+def summarize_backtest(result):
+    """Resumo compacto das janelas: média e desvio de AUC/AP e tempo total."""
+    print(f"\n=== BACKTEST ROLLING ORIGIN ({len(result)} janelas) ===")
+    print(result.drop(columns=["treino_de"]).to_string(
+        index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"AUC: {result['auc'].mean():.4f} ± {result['auc'].std():.4f} | "
+          f"AP: {result['ap'].mean():.4f} ± {result['ap'].std():.4f} | "
+          f"treino total: {result['tempo_s'].sum():.1f}s "
+          f"({result['warm_start'].sum()} janelas com warm start)")
+
+def benchmark_backtest(df, date_col=DATE_COL, min_train_months=3, n_jobs=-1):
+    """Compara o backtest com retreino do zero (sequencial) contra warm start em paralelo."""
+    rows = []
+    for nome, warm, jobs in [("do_zero", False, 1), ("warm_start_paralelo", True, n_jobs)]:
+        t0 = time.perf_counter()
+        result = run_backtest(df, date_col, min_train_months, warm_start=warm, n_jobs=jobs)
+        rows.append({"modo": nome, "tempo_s": time.perf_counter() - t0,
+                     "auc": result["auc"].mean(), "ap": result["ap"].mean()})
+
+    bench = pd.DataFrame(rows)
+    bench["speedup"] = bench["tempo_s"].iloc[0] / bench["tempo_s"]
+    print("\n=== BACKTEST: DO ZERO vs. WARM START ===")
+    print(bench.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    return bench
+
+def main():
+    """Backtest a partir dos JSONs brutos (mantém dt_cand ao lado das features)."""
+    from train import load_and_prepare_data
+
+    df = load_and_prepare_data("data/vagas.json", "data/prospects.json", "data/applicants.json",
+                               extra_cols=[DATE_COL])
+    result = run_backtest(df)
+    summarize_backtest(result)
+    return result
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Módulo de change feed para o projeto Decision AI.
+Log de eventos append-only (prospects, vagas, candidatos) e aplicador que
+recalcula features e scores só dos pares afetados, atualizando o snapshot
+do feature store e os rankings por vaga em memória.
+"""
+
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from feature_engineering import engineer_features, get_final_features, len_cv_quartile_edges
+from feature_store import load_artifact, save_artifact
+from model_utils import (align_features, build_ranking_index, get_candidate_rows, get_vaga_rows,
+                         predict_ranking, update_ranking_index)
+from preprocessing import (clean_dataframe, create_basic_features, cv_length, flatten_applicants,
+                           flatten_prospects, flatten_vagas, load_json)
+
+LOG_PATH = Path(__file__).resolve().parent.parent / "data" / "change_log.jsonl"
+SNAPSHOT_NAME = "serving_snapshot"
+EVENT_TYPES = ("prospect", "vaga", "applicant")
+KEYS = ["vaga_id", "codigo_candidato"]
+REQUIRED_KEYS = {"prospect": KEYS, "vaga": ["vaga_id"], "applicant": ["codigo_candidato"]}
+
+# cadência de checkpoint do snapshot: a cada N eventos aplicados ou T segundos
+# (o que vier primeiro, havendo eventos pendentes); limita o replay do log no
+# próximo start ou troca de versão do modelo
+CHECKPOINT_EVERY_EVENTS = 1_000
+CHECKPOINT_EVERY_S = 300
+
+# nomes do JSON bruto de prospects -> nomes usados no pipeline (ver flatten_prospects)
+PROSPECT_RENAMES = {"codigo": "codigo_candidato", "situacao_candidado": "situacao_candidato"}
+
+# ---------------------------------
+# Log de eventos
+# ---------------------------------
+def make_event(event_type, data, vaga_id=None, codigo_candidato=None):
+    """Monta um evento. prospect: vaga_id + codigo_candidato; vaga: vaga_id; applicant: codigo_candidato."""
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Tipo de evento inválido: {event_type}")
+    event = {"type": event_type, "ts": datetime.now().isoformat(timespec="seconds"), "data": dict(data)}
+    if vaga_id is not None:
+        event["vaga_id"] = str(vaga_id)
+    if codigo_candidato is not None:
+        event["codigo_candidato"] = str(codigo_candidato)
+    return event
+
+def append_events(events, log_path=LOG_PATH):
+    """Acrescenta eventos ao log (uma linha JSON por evento)."""
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    lines = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+def log_size(log_path=LOG_PATH) -> int:
+    log_path = Path(log_path)
+    return log_path.stat().st_size if log_path.exists() else 0
+
+def rejected_path(log_path=LOG_PATH) -> Path:
+    # quarentena ao lado do log: data/change_log.rejected.jsonl
+    return Path(log_path).with_suffix(".rejected.jsonl")
+
+def validate_event(event):
+    """Motivo da rejeição do evento, ou None se ele pode ser aplicado."""
+    if not isinstance(event, dict):
+        return "evento não é um objeto JSON"
+    event_type = event.get("type")
+    if event_type not in EVENT_TYPES:
+        return f"tipo de evento inválido: {event_type!r}"
+    missing = [k for k in REQUIRED_KEYS[event_type] if event.get(k) in (None, "")]
+    if missing:
+        return f"chaves ausentes para {event_type}: {missing}"
+    if not isinstance(event.get("data", {}), dict):
+        return "data deve ser um objeto JSON"
+    return None
+
+def quarantine(rejected, log_path=LOG_PATH):
+    """Grava (evento ou linha bruta, motivo) rejeitados na quarentena do log."""
+    if not rejected:
+        return
+    path = rejected_path(log_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for item, reason in rejected:
+            f.write(json.dumps({"reason": reason, "event": item}, ensure_ascii=False, default=str) + "\n")
+    print(f"Change feed: {len(rejected)} evento(s) rejeitado(s) -> {path}")
+
+def read_events(log_path=LOG_PATH, offset=0):
+    """Lê eventos a partir de um offset em bytes; retorna (eventos, novo offset).
+
+    Linhas incompletas (escrita em andamento) ficam para a próxima leitura;
+    linhas que não são JSON válido vão para a quarentena e o offset avança.
+    """
+    log_path = Path(log_path)
+    if not log_path.exists():
+        return [], offset
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read()
+    end = chunk.rfind(b"\n") + 1
+    events, rejected = [], []
+    for line in chunk[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            events.append(json.loads(line))
+        except ValueError as e:  # JSONDecodeError e UnicodeDecodeError
+            rejected.append((line.decode("utf-8", errors="replace"), f"JSON inválido: {e}"))
+    quarantine(rejected, log_path)
+    return events, offset + end
+
+# ---------------------------------
+# Snapshot (tabelas brutas + features + estatísticas ajustadas)
+# ---------------------------------
+def build_snapshot(vagas_path, prospects_path, applicants_path, log_path=LOG_PATH, save=True):
+    """Gera o snapshot servido pelo app a partir dos JSONs brutos."""
+    print("Gerando snapshot para o change feed...")
+    df_vagas = flatten_vagas(load_json(Path(vagas_path))).drop_duplicates("vaga_id")
+    df_prospects = flatten_prospects(load_json(Path(prospects_path)))
+    df_prospects = df_prospects.drop_duplicates(subset=KEYS).reset_index(drop=True)
+    df_app = flatten_applicants(load_json(Path(applicants_path))).drop_duplicates("codigo_candidato")
+
+    df = df_prospects.merge(df_vagas, on="vaga_id", how="left").merge(df_app, on="codigo_candidato", how="left")
+    df = clean_dataframe(df)
+
+    # estatísticas populacionais, reaplicadas no recálculo incremental
+    scaler = StandardScaler().fit(cv_length(df).to_frame("len_cv_pt"))
+    len_cv_edges = len_cv_quartile_edges(df)
+    text_tfidfs = {}
+    df = create_basic_features(df, scaler=scaler)
+    df = engineer_features(df, len_cv_edges=len_cv_edges, text_tfidfs=text_tfidfs)
+
+    snapshot = {
+        "vagas": df_vagas.set_index("vaga_id"),
+        "applicants": df_app.set_index("codigo_candidato"),
+        "prospects": df_prospects,
+        "features": pd.concat([df[KEYS], df[get_final_features()]], axis=1).reset_index(drop=True),
+        "stats": {"scaler": scaler, "len_cv_edges": len_cv_edges, "text_tfidfs": text_tfidfs},
+        "offset": log_size(log_path),
+    }
+    if save:
+        save_artifact(SNAPSHOT_NAME, snapshot)
+    print(f"Snapshot: {len(snapshot['features'])} pares, offset {snapshot['offset']}")
+    return snapshot
+
+def compute_pair_features(snapshot, rows):
+    """Recalcula as features finais das linhas `rows` do snapshot."""
+    df = (snapshot["prospects"].iloc[rows]
+          .join(snapshot["vagas"], on="vaga_id")
+          .join(snapshot["applicants"], on="codigo_candidato"))
+    df = clean_dataframe(df)
+    stats = snapshot["stats"]
+    df = create_basic_features(df, scaler=stats["scaler"])
+    df = engineer_features(df, len_cv_edges=stats["len_cv_edges"], text_tfidfs=stats["text_tfidfs"])
+    return df[get_final_features()]
+
+def _upsert(table, updates):
+    # aplica {chave: {coluna: valor}} em bloco; chaves novas são acrescentadas
+    if not updates:
+        return table
+    upd = pd.DataFrame.from_dict(updates, orient="index")
+    novos = upd.index.difference(table.index)
+    existentes = upd.drop(index=novos)
+    for col in upd.columns:
+        vals = existentes[col].dropna()
+        if len(vals):
+            if col not in table.columns:
+                table[col] = np.nan
+            table.loc[vals.index, col] = vals.to_numpy(dtype=object)
+    if len(novos):
+        table = pd.concat([table, upd.loc[novos]])
+    return table
+
+# ---------------------------------
+# Estado servido e aplicador
+# ---------------------------------
+class ServingState:
+    """Features, scores e ranking por vaga servidos pelo app.
+
+    Com snapshot, aplica o change feed incrementalmente; sem snapshot
+    (apenas df_clean.csv), é somente leitura.
+    """
+
+    def __init__(self, features, model, version, snapshot=None, log_path=LOG_PATH,
+                 checkpoint_events=CHECKPOINT_EVERY_EVENTS, checkpoint_s=CHECKPOINT_EVERY_S):
+        self.df = features.reset_index(drop=True)
+        self.model = model
+        self.version = version
+        self.snapshot = snapshot
+        self.log_path = Path(log_path)
+        self.offset = snapshot["offset"] if snapshot is not None else log_size(log_path)
+        self.revisions = {}  # vaga_id -> nº de atualizações aplicadas
+        # identifica esta instância: as revisões recomeçam em 0 quando o estado é
+        # reconstruído (mesma versão do modelo), então (versão, revisão) não basta
+        self.token = uuid.uuid4().hex
+        self.lock = threading.Lock()
+        self.checkpoint_events = checkpoint_events
+        self.checkpoint_s = checkpoint_s
+        self._pending = 0  # eventos aplicados desde o último checkpoint
+        self._last_checkpoint = time.monotonic()
+
+        scores = predict_ranking(model, align_features(model, self.df))
+        self.index = build_ranking_index(self.df, scores)
+        self._pair_pos = {(str(v), str(c)): i for i, (v, c) in
+                          enumerate(zip(self.df["vaga_id"], self.df["codigo_candidato"]))}
+
+    @classmethod
+    def load(cls, fallback_df, model, version, log_path=LOG_PATH):
+        """Usa o snapshot do feature store (e reaplica o log pendente) ou o df de fallback."""
+        snapshot = load_artifact(SNAPSHOT_NAME)
+        if snapshot is None:
+            return cls(fallback_df, model, version, log_path=log_path)
+        state = cls(snapshot["features"], model, version, snapshot, log_path)
+        state.poll()
+        return state
+
+    @property
+    def scores(self):
+        return self.index["scores"]
+
+    def revision(self, vaga_id) -> int:
+        return self.revisions.get(str(vaga_id), 0)
+
+    def poll(self) -> int:
+        """Aplica os eventos novos do log; retorna quantos foram aplicados.
+
+        Persiste o snapshot (checkpoint) a cada checkpoint_events eventos ou
+        checkpoint_s segundos com eventos pendentes.
+        """
+        if self.snapshot is None:
+            return 0
+        # leitura, aplicação e avanço do offset sob o mesmo lock: sessões que
+        # compartilham o estado não reaplicam o mesmo trecho do log
+        with self.lock:
+            events, offset = read_events(self.log_path, self.offset)
+            if events:
+                self._apply_locked(events)
+            # o offset avança mesmo com eventos rejeitados (já em quarentena)
+            self.offset = offset
+            self._pending += len(events)
+            n_applied = sum(validate_event(e) is None for e in events)
+            if self._pending and (self._pending >= self.checkpoint_events
+                                  or time.monotonic() - self._last_checkpoint >= self.checkpoint_s):
+                self._checkpoint_locked()
+        return n_applied
+
+    def apply(self, events):
+        """Aplica um lote de eventos: 1 recálculo de features e 1 predição por lote."""
+        if self.snapshot is None:
+            raise ValueError("Change feed requer um snapshot (build_snapshot)")
+        with self.lock:
+            return self._apply_locked(events)
+
+    def _apply_locked(self, events):
+        # chamador já detém self.lock; eventos inválidos vão para a quarentena antes
+        # de qualquer escrita, para que um evento ruim não trave o feed
+        valid, rejected = [], []
+        for e in events:
+            reason = validate_event(e)
+            if reason:
+                rejected.append((e, reason))
+            else:
+                valid.append(e)
+        quarantine(rejected, self.log_path)
+
+        rows, new_pairs = self._apply_raw(valid)
+        if len(rows) == 0:
+            return rows
+        feats = compute_pair_features(self.snapshot, rows)
+
+        # novos pares entram no fim do frame de features
+        n_old = len(self.df)
+        n_new = len(self.snapshot["prospects"]) - n_old
+        if n_new > 0:
+            new_keys = self.snapshot["prospects"].iloc[n_old:][KEYS].reset_index(drop=True)
+            self.df = pd.concat([self.df, new_keys], ignore_index=True)
+
+        for c in feats.columns:
+            if c in self.df.columns:
+                self.df.loc[rows, c] = feats[c].astype(self.df[c].dtype).array
+        self.snapshot["features"] = self.df
+
+        scores = predict_ranking(self.model, align_features(self.model, self.df.iloc[rows]))
+        self.index = update_ranking_index(self.index, self.df, rows, scores)
+        for v in pd.unique(self.df["vaga_id"].iloc[rows].astype(str)):
+            self.revisions[v] = self.revisions.get(v, 0) + 1
+        # posições dos pares novos só passam a valer com o lote aplicado
+        self._pair_pos.update(new_pairs)
+        return rows
+
+    def _apply_raw(self, events):
+        # atualiza tabelas brutas do snapshot e devolve (linhas afetadas, posições dos
+        # pares novos); as escritas são acumuladas e aplicadas em bloco (última vence)
+        vaga_upd, app_upd, pair_upd, new_rows, new_pairs = {}, {}, {}, {}, {}
+        for e in events:
+            data = {PROSPECT_RENAMES.get(k, k): v for k, v in e.get("data", {}).items()}
+            if e["type"] == "vaga":
+                vaga_upd.setdefault(str(e["vaga_id"]), {}).update(data)
+            elif e["type"] == "applicant":
+                app_upd.setdefault(str(e["codigo_candidato"]), {}).update(data)
+            elif e["type"] == "prospect":
+                key = (str(e["vaga_id"]), str(e["codigo_candidato"]))
+                pos = self._pair_pos.get(key, new_pairs.get(key))
+                if pos is None:
+                    pos = len(self.df) + len(new_rows)
+                    new_pairs[key] = pos
+                    new_rows[pos] = {"vaga_id": key[0], "codigo_candidato": key[1]}
+                (new_rows[pos] if pos in new_rows else pair_upd.setdefault(pos, {})).update(data)
+            else:
+                raise ValueError(f"Tipo de evento inválido: {e['type']}")
+
+        snap = self.snapshot
+        snap["vagas"] = _upsert(snap["vagas"], vaga_upd)
+        snap["applicants"] = _upsert(snap["applicants"], app_upd)
+        snap["prospects"] = _upsert(snap["prospects"], pair_upd)
+        if new_rows:
+            snap["prospects"] = pd.concat([snap["prospects"], pd.DataFrame(list(new_rows.values()))],
+                                          ignore_index=True)
+
+        affected = set(pair_upd) | set(new_rows)
+        new_vagas = np.array([r["vaga_id"] for r in new_rows.values()])
+        new_cands = np.array([r["codigo_candidato"] for r in new_rows.values()])
+        new_pos = np.array(list(new_rows), dtype=np.int64)
+        for vid in vaga_upd:
+            affected.update(get_vaga_rows(self.index, vid).tolist())
+            affected.update(new_pos[new_vagas == vid].tolist())
+        for cid in app_upd:
+            affected.update(get_candidate_rows(self.index, cid).tolist())
+            affected.update(new_pos[new_cands == cid].tolist())
+        return np.array(sorted(affected), dtype=np.int64), new_pairs
+
+    def checkpoint(self):
+        """Persiste o snapshot atualizado (com offset) no feature store."""
+        if self.snapshot is None:
+            return
+        with self.lock:
+            self._checkpoint_locked()
+
+    def _checkpoint_locked(self):
+        self.snapshot["offset"] = self.offset
+        save_artifact(SNAPSHOT_NAME, self.snapshot)
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+
+# ---------------------------------
+# Benchmark
+# ---------------------------------
+STATUS_CHOICES = ["Encaminhado ao Requisitante", "Entrevista Técnica", "Aprovado", "Contratado pela Decision"]
+
+def benchmark_change_feed(state, n_events=5_000, batch_size=500, seed=42, log_path=None):
+    """Mede eventos/s e frescor (tempo do log até o ranking atualizado)."""
+    import tempfile
+
+    rng = np.random.default_rng(seed)
+    log_path = Path(log_path or Path(tempfile.mkdtemp()) / "bench_log.jsonl")
+    state.log_path, state.offset = log_path, log_size(log_path)
+    # o offset do log temporário não vale para o snapshot: sem checkpoint no benchmark
+    state.checkpoint_events = state.checkpoint_s = float("inf")
+
+    rows = rng.integers(0, len(state.df), size=n_events)
+    keys = state.df[KEYS].astype(str).to_numpy()[rows]
+    events = [
+        make_event("prospect",
+                   {"situacao_candidado": str(rng.choice(STATUS_CHOICES)), "ultima_atualizacao": "15-03-2021"},
+                   vaga_id=v, codigo_candidato=c)
+        for v, c in keys
+    ]
+
+    latencies = []
+    t0 = time.perf_counter()
+    for start in range(0, n_events, batch_size):
+        t_batch = time.perf_counter()
+        append_events(events[start:start + batch_size], log_path)
+        state.poll()
+        latencies.append(time.perf_counter() - t_batch)
+    elapsed = time.perf_counter() - t0
+
+    print("=== BENCHMARK CHANGE FEED ===")
+    print(f"Eventos: {n_events} em lotes de {batch_size}")
+    print(f"Throughput: {n_events / elapsed:,.0f} eventos/s")
+    print(f"Frescor por lote: mediana {np.median(latencies):.3f}s, máx {np.max(latencies):.3f}s")
+    return {"events_per_s": n_events / elapsed, "latency_median_s": float(np.median(latencies))}
+
+if __name__ == "__main__":
+    snapshot = build_snapshot("data/vagas.json", "data/prospects.json", "data/applicants.json")
+    from model_registry import load_active_model
+    model, version = load_active_model()
+    benchmark_change_feed(ServingState(snapshot["features"], model, version, snapshot))
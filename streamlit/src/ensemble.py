@@ -0,0 +1,112 @@
+"""
+Módulo de ensemble dos modelos de fold para o projeto Decision AI.
+Funde os boosters de todos os folds em uma única floresta LightGBM com
+folhas escaladas, de modo que a média dos folds custa uma só predição.
+"""
+
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from sklearn.metrics import roc_auc_score, average_precision_score
+
+_TREE_SPLIT = re.compile(r"^Tree=\d+\n", flags=re.M)
+_SCALED_KEYS = ("leaf_value=", "internal_value=")
+
+def _split_model_string(model_str):
+    """Separa o texto do modelo em (cabeçalho, blocos de árvores, rodapé)."""
+    body, footer = model_str.split("end of trees", 1)
+    parts = _TREE_SPLIT.split(body)
+    return parts[0], parts[1:], "end of trees" + footer
+
+def _scale_tree(tree_str, factor):
+    """Multiplica os valores das folhas (e nós internos) de uma árvore."""
+    lines = []
+    for line in tree_str.split("\n"):
+        if line.startswith(_SCALED_KEYS):
+            key, values = line.split("=", 1)
+            scaled = " ".join(f"{float(v) * factor:.17g}" for v in values.split())
+            line = f"{key}={scaled}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def merge_boosters(boosters, weights=None):
+    """Funde boosters binários em um só, equivalente à média ponderada dos scores brutos.
+
+    Cada booster deve vir com (booster, num_iteration) para respeitar o early stopping.
+    """
+    weights = np.full(len(boosters), 1.0 / len(boosters)) if weights is None else np.asarray(weights)
+    header, trees = None, []
+    footer = None
+    for (booster, num_iteration), w in zip(boosters, weights):
+        h, blocks, f = _split_model_string(booster.model_to_string(num_iteration=num_iteration))
+        if header is None:
+            # tree_sizes deixa de valer após a fusão; sem ele o LightGBM lê em sequência
+            header = "\n".join(l for l in h.split("\n") if not l.startswith("tree_sizes="))
+            footer = f
+        trees.extend(_scale_tree(b, w) for b in blocks)
+
+    merged = header + "".join(f"Tree={i}\n{t}" for i, t in enumerate(trees)) + footer
+    return lgb.Booster(model_str=merged)
+
+class ForestEnsemble:
+    """Ensemble dos folds compilado em uma única floresta (interface predict_proba)."""
+
+    def __init__(self, models):
+        self.booster_ = merge_boosters([(m.booster_, m.best_iteration_ or None) for m in models])
+        self.n_models_ = len(models)
+        self.feature_names_in_ = np.asarray(self.booster_.feature_name())
+        self.feature_importances_ = self.booster_.feature_importance(importance_type="split")
+
+    def predict_proba(self, X, **kwargs):
+        p = self.booster_.predict(X)
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+def benchmark_ensemble(df, holdout_frac=0.2, n_folds=5, n_repeats=5, seed=42):
+    """Compara o ensemble fundido com o melhor fold (e com a média ingênua dos folds)
+    em um holdout de vagas não vistas: AUC/AP e latência de inferência."""
+    from sklearn.model_selection import GroupShuffleSplit
+    from train import cross_validate
+
+    gss = GroupShuffleSplit(n_splits=1, test_size=holdout_frac, random_state=seed)
+    fit_idx, test_idx = next(gss.split(df, groups=df["vaga_id"]))
+    df_fit, df_test = df.iloc[fit_idx], df.iloc[test_idx]
+    X_test = df_test.drop(columns=["vaga_id", "codigo_candidato", "situacao_ord"])
+    y_test = (df_test["situacao_ord"] == 5).astype(int)
+
+    fold_models, auc_scores, _ = cross_validate(df_fit, n_folds=n_folds)
+    best_model = fold_models[int(np.argmax(auc_scores))]
+    ensemble = ForestEnsemble(fold_models)
+
+    def naive_average(X):
+        return np.mean([m.predict_proba(X, num_iteration=m.best_iteration_)[:, 1] for m in fold_models], axis=0)
+
+    candidates = {
+        "melhor_fold": lambda X: best_model.predict_proba(X, num_iteration=best_model.best_iteration_)[:, 1],
+        "media_folds_ingenua": naive_average,
+        "ensemble_fundido": lambda X: ensemble.predict_proba(X)[:, 1],
+    }
+    rows = []
+    for name, predict in candidates.items():
+        times = []
+        for _ in range(n_repeats):
+            t0 = time.perf_counter()
+            p = predict(X_test)
+            times.append(time.perf_counter() - t0)
+        rows.append({
+            "modelo": name,
+            "latencia_ms": np.median(times) * 1000,
+            "auc": roc_auc_score(y_test, p),
+            "ap": average_precision_score(y_test, p),
+        })
+
+    result = pd.DataFrame(rows)
+    print(f"\n=== ENSEMBLE DE FOLDS ({ensemble.n_models_} modelos, {ensemble.booster_.num_trees()} árvores) ===")
+    print(f"Holdout: {len(X_test)} pares de {df_test['vaga_id'].nunique()} vagas")
+    print(result.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    return result
@@ -82,8 +82,8 @@ def plot_precision_recall_curve(y_test, y_pred_proba, save_path=None):
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
     plt.show()
 
-def feature_importance_analysis(model, feature_names, top_k=15):
-    """Analisa importância das features."""
+def feature_importance_analysis(model, feature_names, top_k=15, show=True):
+    """Analisa importância das features (show=False não abre o plot bloqueante)."""
     if hasattr(model, 'feature_importances_'):
         importance = model.feature_importances_
     else:
@@ -97,12 +97,13 @@ def feature_importance_analysis(model, feature_names, top_k=15):
     }).sort_values('importance', ascending=False)
     
     # Plot
-    plt.figure(figsize=(10, 8))
-    sns.barplot(data=df_importance.head(top_k), x='importance', y='feature')
-    plt.title(f'Top {top_k} Features - Decision AI Model')
-    plt.xlabel('Importância')
-    plt.tight_layout()
-    plt.show()
+    if show:
+        plt.figure(figsize=(10, 8))
+        sns.barplot(data=df_importance.head(top_k), x='importance', y='feature')
+        plt.title(f'Top {top_k} Features - Decision AI Model')
+        plt.xlabel('Importância')
+        plt.tight_layout()
+        plt.show()
     
     print(f"\n=== TOP {top_k} FEATURES MAIS IMPORTANTES ===")
     for idx, row in df_importance.head(top_k).iterrows():
@@ -149,6 +150,7 @@ def main():
     from train import load_and_prepare_data
     from feature_engineering import get_final_features
     from sklearn.model_selection import train_test_split
+    from model_registry import load_active_model
     
     print("=== AVALIAÇÃO DO MODELO DECISION AI ===")
     
@@ -164,8 +166,9 @@ def main():
         X, y, test_size=0.2, random_state=42, stratify=y
     )
     
-    # Carregar modelo
-    model = load_model("models/model_lgbm.pkl")
+    # Carregar modelo (versão promovida no registry)
+    model, version = load_active_model()
+    print(f"Versão do modelo: {version}")
     
     # Avaliar
     results = evaluate_model(model, X_test, y_test)
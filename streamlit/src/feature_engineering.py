@@ -8,6 +8,8 @@ import numpy as np
 import re
 from datetime import datetime
 
+from text_similarity import TEXT_SIM_FEATURES, create_text_similarity_features
+
 # Constantes globais
 TECH_TERMS = [
     "sap","abap","hana","sql","python","java",".net","c#","node",
@@ -128,10 +130,11 @@ def map_situacao_ordinal(situacao_str):
 def create_funnel_features(df):
     """Cria features do funil temporal."""
     def to_date(s): 
-        return pd.to_datetime(s, dayfirst=True, errors="coerce")
+        # format="mixed": formato inferido por elemento, vetorizado
+        return pd.to_datetime(s, dayfirst=True, errors="coerce", format="mixed")
     
-    df["dt_cand"] = get_series(df, "data_candidatura").apply(to_date)
-    df["dt_ult"] = get_series(df, "ultima_atualizacao").apply(to_date)
+    df["dt_cand"] = to_date(get_series(df, "data_candidatura"))
+    df["dt_ult"] = to_date(get_series(df, "ultima_atualizacao"))
     df["days_update"] = (df["dt_ult"] - df["dt_cand"]).dt.days.fillna(0).astype(np.int16)
     
     # Situação ordinal
@@ -139,16 +142,46 @@ def create_funnel_features(df):
     
     return df
 
-def create_interaction_features(df):
+def len_cv_quartile_edges(df):
+    """Cortes dos quartis de tamanho do CV (para binning incremental)."""
+    len_cv_pt_raw = get_series(df, "cv_pt").astype(str).str.len()
+    return np.quantile(len_cv_pt_raw, [0.25, 0.5, 0.75])
+
+def create_interaction_features(df, len_cv_edges=None):
     """Cria features de interação."""
-    # Binning de CV
+    # Binning de CV (com cortes fixos, quando informados)
     len_cv_pt_raw = get_series(df, "cv_pt").astype(str).str.len()
-    df["len_cv_bin"] = pd.qcut(len_cv_pt_raw.rank(method="first"), q=4, labels=False, duplicates="drop").astype("Int8")
+    if len_cv_edges is None:
+        df["len_cv_bin"] = pd.qcut(len_cv_pt_raw.rank(method="first"), q=4, labels=False, duplicates="drop").astype("Int8")
+    else:
+        df["len_cv_bin"] = pd.Series(np.searchsorted(len_cv_edges, len_cv_pt_raw, side="right"), index=df.index).astype("Int8")
     
     # Interação inglês + senioridade
     df["ok_eng_sen"] = (df["ingles_ok"] & df["senioridade_ok"]).astype(np.int8)
     
     return df
 
-def engineer_features(df):
-    """Pipeline completo de engenharia de features."""
+def engineer_features(df, len_cv_edges=None, text_tfidfs=None):
+    """Pipeline completo de engenharia de features.
+
+    len_cv_edges e text_tfidfs permitem reaplicar estatísticas já ajustadas
+    (recálculo incremental de poucos pares).
+    """
+    df = create_technical_features(df)
+    df = create_language_features(df)
+    df = create_seniority_features(df)
+    df = create_funnel_features(df)
+    df = create_interaction_features(df, len_cv_edges)
+    df = create_text_similarity_features(df, tfidfs=text_tfidfs)
+    return df
+
+def get_final_features():
+    """Lista das features finais (inclui o target situacao_ord)."""
+    return [
+        "tech_overlap_count", "cand_has_sap", "is_sap_vaga", "sap_pair",
+        "ingles_ok", "espanhol_ok",
+        "vaga_ing_rank", "cand_ing_rank", "vaga_esp_rank", "cand_esp_rank",
+        "vaga_sen_rank", "cand_sen_rank", "senioridade_gap", "senioridade_ok",
+        "days_update", "situacao_ord",
+        "len_cv_bin", "ok_eng_sen", "len_cv_pt_z",
+    ] + TEXT_SIM_FEATURES
@@ -0,0 +1,40 @@
+# streamlit/src/feature_store.py
+import os
+import tempfile
+from pathlib import Path
+
+import joblib
+
+STORE_DIR = Path(__file__).resolve().parent.parent / "data" / "feature_store"
+
+def data_fingerprint(path) -> str:
+    # identifica a versão do arquivo de origem (tamanho + mtime)
+    st = Path(path).stat()
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+def artifact_path(name: str, store_dir=STORE_DIR) -> Path:
+    return Path(store_dir) / f"{name}.joblib"
+
+def save_artifact(name: str, obj, meta=None, store_dir=STORE_DIR) -> Path:
+    # escrita atômica: grava em arquivo temporário e troca com os.replace
+    path = artifact_path(name, store_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump({"meta": meta, "obj": obj}, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+def load_artifact(name: str, meta=None, store_dir=STORE_DIR):
+    # retorna None se o artefato não existe ou foi gerado de outra origem (meta)
+    path = artifact_path(name, store_dir)
+    if not path.exists():
+        return None
+    payload = joblib.load(path)
+    if meta is not None and payload.get("meta") != meta:
+        return None
+    return payload["obj"]
@@ -0,0 +1,81 @@
+# streamlit/src/insights.py
+import numpy as np
+import pandas as pd
+
+from feature_store import load_artifact, save_artifact
+from model_utils import align_features, predict_ranking
+
+SAMPLE_SIZE = 1000
+MAX_GRID = 20
+INTERACTION_GRID = 10
+INTERACTION_PAIRS = [
+    ("senioridade_gap", "tech_overlap_count"),
+    ("cand_ing_rank", "vaga_ing_rank"),
+    ("tech_overlap_count", "len_cv_pt_z"),
+]
+
+def stratified_sample(df: pd.DataFrame, n=SAMPLE_SIZE, seed=42) -> pd.DataFrame:
+    # amostra proporcional por classe (contratado vs. demais)
+    if len(df) <= n:
+        return df
+    y = (df["situacao_ord"] == 5).to_numpy()
+    rng = np.random.default_rng(seed)
+    idx = []
+    for cls in (True, False):
+        pos = np.flatnonzero(y == cls)
+        k = max(1, int(round(n * len(pos) / len(df))))
+        idx.append(rng.choice(pos, size=min(k, len(pos)), replace=False))
+    return df.iloc[np.sort(np.concatenate(idx))]
+
+def feature_grid(values, max_points=MAX_GRID) -> np.ndarray:
+    # valores únicos para features discretas; quantis para contínuas
+    values = pd.to_numeric(pd.Series(values), errors="coerce").dropna().to_numpy()
+    uniq = np.unique(values)
+    if len(uniq) <= max_points:
+        return uniq
+    return np.unique(np.quantile(values, np.linspace(0.02, 0.98, max_points)))
+
+def partial_dependence(model, X: pd.DataFrame, feature: str, grid=None):
+    """Dependência parcial com uma única predição sobre a matriz empilhada (grid × amostra)."""
+    grid = feature_grid(X[feature]) if grid is None else np.asarray(grid)
+    stacked = pd.DataFrame(np.tile(X.to_numpy(dtype=np.float64), (len(grid), 1)), columns=X.columns)
+    stacked[feature] = np.repeat(grid, len(X))
+    preds = predict_ranking(model, stacked).reshape(len(grid), len(X))
+    return {"grid": grid, "mean": preds.mean(axis=1),
+            "p10": np.quantile(preds, 0.1, axis=1), "p90": np.quantile(preds, 0.9, axis=1)}
+
+def interaction_grid(model, X: pd.DataFrame, f1: str, f2: str, grid1=None, grid2=None):
+    """Superfície de dependência parcial de duas features, também em uma única predição."""
+    grid1 = feature_grid(X[f1], INTERACTION_GRID) if grid1 is None else np.asarray(grid1)
+    grid2 = feature_grid(X[f2], INTERACTION_GRID) if grid2 is None else np.asarray(grid2)
+    n_cells = len(grid1) * len(grid2)
+    stacked = pd.DataFrame(np.tile(X.to_numpy(dtype=np.float64), (n_cells, 1)), columns=X.columns)
+    stacked[f1] = np.repeat(np.repeat(grid1, len(grid2)), len(X))
+    stacked[f2] = np.repeat(np.tile(grid2, len(grid1)), len(X))
+    preds = predict_ranking(model, stacked).reshape(len(grid1), len(grid2), len(X))
+    return {"grid1": grid1, "grid2": grid2, "mean": preds.mean(axis=2)}
+
+def compute_insights(model, df: pd.DataFrame, pairs=INTERACTION_PAIRS, n_sample=SAMPLE_SIZE) -> dict:
+    X = align_features(model, stratified_sample(df, n_sample))
+    pd_curves = {f: partial_dependence(model, X, f) for f in X.columns}
+    interactions = {(a, b): interaction_grid(model, X, a, b)
+                    for a, b in pairs if a in X.columns and b in X.columns}
+    return {"n_sample": len(X), "partial_dependence": pd_curves, "interactions": interactions}
+
+def get_insights(model, version: str, df: pd.DataFrame, pairs=INTERACTION_PAIRS) -> dict:
+    """Insights em cache no disco por versão do modelo; pares novos são calculados e anexados."""
+    name = f"insights_{version}"
+    insights = load_artifact(name, meta=version)
+    if insights is None:
+        insights = compute_insights(model, df, pairs)
+        save_artifact(name, insights, meta=version)
+        return insights
+
+    faltando = [p for p in pairs if p not in insights["interactions"]]
+    if faltando:
+        X = align_features(model, stratified_sample(df, insights["n_sample"]))
+        for a, b in faltando:
+            if a in X.columns and b in X.columns:
+                insights["interactions"][(a, b)] = interaction_grid(model, X, a, b)
+        save_artifact(name, insights, meta=version)
+    return insights
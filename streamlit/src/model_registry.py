@@ -0,0 +1,167 @@
+# streamlit/src/model_registry.py
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from model_utils import _resolve, load_model, model_version
+
+REGISTRY_DIR = Path(__file__).resolve().parent.parent / "models" / "registry"
+LEGACY_MODEL_PATH = Path(__file__).resolve().parent.parent / "models" / "model_lgbm.pkl"
+CURRENT_FILE = "CURRENT"
+MODEL_FILE = "model.pkl"
+MANIFEST_FILE = "manifest.json"
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _atomic_write_text(path: Path, text: str):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def register_model(model, metrics=None, features=None, registry_dir=REGISTRY_DIR) -> str:
+    """Grava o modelo em um diretório versionado com manifest; retorna a versão."""
+    registry_dir = Path(registry_dir)
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=registry_dir, prefix=".tmp-"))
+    try:
+        joblib.dump(model, tmp_dir / MODEL_FILE)
+        checksum = _sha256(tmp_dir / MODEL_FILE)
+        version = f"{datetime.now():%Y%m%d-%H%M%S}-{checksum[:8]}"
+        if features is None and hasattr(model, "feature_names_in_"):
+            features = [str(f) for f in model.feature_names_in_]
+        manifest = {
+            "version": version,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "model_file": MODEL_FILE,
+            "checksum": checksum,
+            "features": list(features or []),
+            "metrics": {k: float(v) for k, v in (metrics or {}).items()},
+        }
+        (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        # o diretório só aparece com o nome final depois de completo
+        os.replace(tmp_dir, registry_dir / version)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"Modelo registrado: {version}")
+    return version
+
+def read_manifest(version: str, registry_dir=REGISTRY_DIR) -> dict:
+    with open(Path(registry_dir) / version / MANIFEST_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+def load_version(version: str, registry_dir=REGISTRY_DIR):
+    """Carrega (modelo, manifest) de uma versão, validando o checksum."""
+    manifest = read_manifest(version, registry_dir)
+    path = Path(registry_dir) / version / manifest["model_file"]
+    if _sha256(path) != manifest["checksum"]:
+        raise ValueError(f"Checksum inválido para a versão {version}")
+    return load_model(path), manifest
+
+def promote(version: str, registry_dir=REGISTRY_DIR):
+    """Promove uma versão registrada (troca atômica do ponteiro CURRENT)."""
+    load_version(version, registry_dir)  # valida antes de expor ao app
+    _atomic_write_text(Path(registry_dir) / CURRENT_FILE, version)
+    print(f"Modelo promovido: {version}")
+
+def current_version(registry_dir=REGISTRY_DIR):
+    path = Path(registry_dir) / CURRENT_FILE
+    if not path.exists():
+        return None
+    return path.read_text(encoding="utf-8").strip() or None
+
+def list_versions(registry_dir=REGISTRY_DIR) -> pd.DataFrame:
+    registry_dir = Path(registry_dir)
+    rows = []
+    if registry_dir.exists():
+        for d in sorted(registry_dir.iterdir()):
+            if d.is_dir() and (d / MANIFEST_FILE).exists():
+                m = read_manifest(d.name, registry_dir)
+                rows.append({"version": m["version"], "created_at": m["created_at"], **m["metrics"]})
+    df = pd.DataFrame(rows)
+    if len(df):
+        df["current"] = df["version"] == current_version(registry_dir)
+    return df
+
+def load_active_model(registry_dir=REGISTRY_DIR, fallback_path=LEGACY_MODEL_PATH):
+    """(modelo, versão) promovido; sem registry, usa o artefato legado."""
+    version = current_version(registry_dir)
+    if version is not None:
+        model, _ = load_version(version, registry_dir)
+        return model, version
+    return load_model(fallback_path), model_version(fallback_path)
+
+class ModelWatcher:
+    """Observa o ponteiro CURRENT e troca o modelo em background.
+
+    O modelo em uso continua servindo enquanto a nova versão é carregada;
+    a troca é uma única atribuição da tupla (modelo, versão).
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, fallback_path=LEGACY_MODEL_PATH, interval=5.0):
+        self.registry_dir = Path(registry_dir)
+        self.fallback_path = _resolve(fallback_path)
+        self.interval = interval
+        self._active = load_active_model(self.registry_dir, self.fallback_path)
+        self._failed = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="model-watcher")
+
+    @property
+    def version(self) -> str:
+        return self._active[1]
+
+    def get(self):
+        return self._active
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self) -> bool:
+        # carrega e troca se houver nova versão promovida; True se trocou
+        version = current_version(self.registry_dir)
+        if version is None or version in (self.version, self._failed):
+            return False
+        try:
+            model, _ = load_version(version, self.registry_dir)
+        except Exception as e:
+            self._failed = version
+            print(f"Falha ao carregar versão {version}, mantendo {self.version}: {e}")
+            return False
+        self._active = (model, version)
+        print(f"Modelo trocado para a versão {version}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+_WATCHERS = {}
+_WATCHERS_LOCK = threading.Lock()
+
+def get_watcher(registry_dir=REGISTRY_DIR, fallback_path=LEGACY_MODEL_PATH, interval=5.0) -> ModelWatcher:
+    """Watcher único por registry no processo (compartilhado entre as páginas do app)."""
+    key = str(Path(registry_dir).resolve())
+    with _WATCHERS_LOCK:
+        if key not in _WATCHERS:
+            _WATCHERS[key] = ModelWatcher(registry_dir, fallback_path, interval).start()
+        return _WATCHERS[key]
@@ -1,4 +1,5 @@
 # streamlit/src/model_utils.py
+import hashlib
 from pathlib import Path
 import numpy as np
 import pandas as pd
@@ -30,6 +31,26 @@ def load_model(model_path):
         with open(path, "rb") as f:
             return pickle.load(f)
 
+def model_version(model_path) -> str:
+    # versão = hash do conteúdo do artefato; muda a cada novo modelo salvo
+    path = _resolve(model_path)
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+
+def align_features(model, df: pd.DataFrame) -> pd.DataFrame:
+    drop_cols = ["vaga_id", "codigo_candidato", "situacao_ord"]
+    X = df.drop(columns=[c for c in drop_cols if c in df.columns])
+    # reordena/alinha colunas se o modelo expõe feature_names_in_; feature ausente é
+    # erro (preencher com 0 pontuaria tudo em silêncio com um modelo desalinhado)
+    if hasattr(model, "feature_names_in_"):
+        missing = [f for f in model.feature_names_in_ if f not in X.columns]
+        if missing:
+            raise ValueError(
+                f"Features do modelo ausentes nos dados: {missing}. "
+                "Regenere o dataset com engineer_features (ou use o snapshot do change feed)."
+            )
+        X = X[list(model.feature_names_in_)]
+    return X
+
 def predict_ranking(model, X: pd.DataFrame) -> np.ndarray:
     if hasattr(model, "predict_proba"):
         return model.predict_proba(X)[:, 1]
@@ -41,3 +62,195 @@ def get_feature_importance(model, feature_names):
         return (pd.DataFrame({"feature": feature_names, "importance": imp})
                   .sort_values("importance", ascending=False))
     return None
+
+def _csr_segments(keys: pd.Series, scores: np.ndarray) -> tuple[dict, np.ndarray, np.ndarray]:
+    # segmentos CSR chave -> linhas de df ordenadas por score decrescente
+    codes, uniques = pd.factorize(keys.astype(str), sort=True)
+    order = np.lexsort((-scores, codes))
+    counts = np.bincount(codes, minlength=len(uniques))
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    return {k: i for i, k in enumerate(uniques)}, indptr, order
+
+def build_ranking_index(df: pd.DataFrame, scores: np.ndarray) -> dict:
+    # índice CSR vaga -> candidatos e, sobre os mesmos scores, candidato -> vagas
+    scores = np.asarray(scores, dtype=np.float32)
+    vaga_pos, indptr, order = _csr_segments(df["vaga_id"], scores)
+    cand_pos, cand_indptr, cand_order = _csr_segments(df["codigo_candidato"], scores)
+    return {
+        "vaga_pos": vaga_pos,
+        "indptr": indptr,
+        "order": order,
+        "cand_pos": cand_pos,
+        "cand_indptr": cand_indptr,
+        "cand_order": cand_order,
+        "scores": scores,
+    }
+
+def get_vaga_rows(index: dict, vaga_id) -> np.ndarray:
+    # posições (em df) dos candidatos da vaga, já ordenadas por score
+    pos = index["vaga_pos"].get(str(vaga_id))
+    if pos is None:
+        return np.empty(0, dtype=np.int64)
+    return index["order"][index["indptr"][pos]:index["indptr"][pos + 1]]
+
+def get_candidate_rows(index: dict, codigo_candidato, k=None) -> np.ndarray:
+    # posições (em df) das vagas do candidato, já ordenadas por score; O(k), sem varrer df
+    pos = index["cand_pos"].get(str(codigo_candidato))
+    if pos is None:
+        return np.empty(0, dtype=np.int64)
+    start, stop = index["cand_indptr"][pos], index["cand_indptr"][pos + 1]
+    if k is not None:
+        stop = min(stop, start + k)
+    return index["cand_order"][start:stop]
+
+def top_vagas_for_candidate(index: dict, df: pd.DataFrame, codigo_candidato, k=10) -> pd.DataFrame:
+    """Top-k vagas de um candidato (busca reversa) com o score do par."""
+    rows = get_candidate_rows(index, codigo_candidato, k)
+    out = df.iloc[rows].copy()
+    out["probabilidade_contratacao"] = index["scores"][rows]
+    return out.reset_index(drop=True)
+
+def _resort_segments(order, indptr, pos_map, keys, scores):
+    for key in keys:
+        pos = pos_map[key]
+        start, stop = indptr[pos], indptr[pos + 1]
+        seg = order[start:stop]
+        order[start:stop] = seg[np.argsort(-scores[seg], kind="stable")]
+
+def update_ranking_index(index: dict, df: pd.DataFrame, rows, scores) -> dict:
+    # atualiza scores de linhas existentes reordenando só os segmentos das vagas e
+    # dos candidatos afetados; linhas novas (df maior que o índice) exigem reconstrução
+    rows = np.asarray(rows, dtype=np.int64)
+    if len(df) != len(index["scores"]):
+        new_scores = np.zeros(len(df), dtype=np.float32)
+        new_scores[:len(index["scores"])] = index["scores"]
+        new_scores[rows] = scores
+        return build_ranking_index(df, new_scores)
+
+    index["scores"][rows] = scores
+    _resort_segments(index["order"], index["indptr"], index["vaga_pos"],
+                     pd.unique(df["vaga_id"].iloc[rows].astype(str)), index["scores"])
+    _resort_segments(index["cand_order"], index["cand_indptr"], index["cand_pos"],
+                     pd.unique(df["codigo_candidato"].iloc[rows].astype(str)), index["scores"])
+    return index
+
+# ---- cascata: pré-filtro barato + modelo completo só nos sobreviventes ----
+# as quatro features de compatibilidade sozinhas recuperam mal o top-k do modelo
+# completo; days_update e len_cv_pt_z (já calculadas) fecham a diferença
+PREFILTER_FEATURES = ["tech_overlap_count", "sap_pair", "ingles_ok", "senioridade_ok",
+                      "days_update", "len_cv_pt_z"]
+
+def fit_prefilter(model, df: pd.DataFrame, features=PREFILTER_FEATURES,
+                  n_trees=8, max_depth=2, sample_size=50_000, seed=42):
+    """Destila o modelo completo em poucas árvores rasas sobre features baratas.
+
+    O alvo é o logit do score completo, então o pré-filtro aprende a ordenação
+    que a cascata precisa preservar (e não o rótulo).
+    """
+    from lightgbm import LGBMRegressor
+    sample = df.sample(min(sample_size, len(df)), random_state=seed)
+    p = np.clip(predict_ranking(model, align_features(model, sample)), 1e-6, 1 - 1e-6)
+    prefilter = LGBMRegressor(n_estimators=n_trees, max_depth=max_depth,
+                              num_leaves=2 ** max_depth, learning_rate=0.5, verbose=-1)
+    prefilter.fit(sample[features], np.log(p / (1 - p)))
+    prefilter.features_ = list(features)
+    return prefilter
+
+def _group_rank(scores: np.ndarray, groups) -> tuple[np.ndarray, np.ndarray]:
+    # posição de cada linha no ranking decrescente da sua vaga, e o tamanho da vaga
+    if groups is None:
+        codes = np.zeros(len(scores), dtype=np.int64)
+    else:
+        codes, _ = pd.factorize(np.asarray(groups))
+    order = np.lexsort((-scores, codes))
+    sizes = np.bincount(codes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.empty(len(scores), dtype=np.int64)
+    rank[order] = np.arange(len(scores)) - starts[codes[order]]
+    return rank, sizes[codes]
+
+def predict_cascade(model, prefilter, df: pd.DataFrame, keep_rate=0.3, min_keep=20,
+                    by=None) -> tuple[np.ndarray, np.ndarray]:
+    """Scores em duas etapas: o pré-filtro poda, o modelo completo pontua os sobreviventes.
+
+    Em cada grupo (`by`; None = base inteira) maior que min_keep mantém
+    max(ceil(keep_rate·n), min_keep) pares; grupos com até min_keep pares vão
+    direto ao modelo completo, sem passar pelo pré-filtro.
+    O padrão é a busca na base inteira: com as vagas atuais (até 25 pares) quase
+    todo grupo fica abaixo de min_keep e a poda por vaga não reduz o custo.
+    Retorna (scores, pontuado); pares podados recebem score 0.
+    """
+    if by is None:
+        codes = np.zeros(len(df), dtype=np.int64)
+    else:
+        codes, _ = pd.factorize(df[by])
+    sizes = np.bincount(codes)[codes]
+    scored = sizes <= min_keep
+    big = np.flatnonzero(~scored)
+    if len(big):
+        pre = prefilter.predict(df.iloc[big][prefilter.features_])
+        rank, _ = _group_rank(pre, codes[big])
+        scored[big] = rank < np.maximum(np.ceil(sizes[big] * keep_rate), min_keep)
+
+    scores = np.zeros(len(df), dtype=np.float64)
+    if scored.all():
+        return predict_ranking(model, align_features(model, df)), scored
+    rows = np.flatnonzero(scored)
+    if len(rows):
+        scores[rows] = predict_ranking(model, align_features(model, df.iloc[rows]))
+    return scores, scored
+
+def topk_recall(full_scores, cascade_scores, groups=None, k=10) -> float:
+    """Fração do top-k do scoring completo que a cascata também coloca no top-k
+    (média sobre os grupos; grupos com menos de k pares contam o que têm)."""
+    full_rank, sizes = _group_rank(np.asarray(full_scores, dtype=np.float64), groups)
+    casc_rank, _ = _group_rank(np.asarray(cascade_scores, dtype=np.float64), groups)
+    top_full = full_rank < k
+    hit = top_full & (casc_rank < k)
+    if groups is None:
+        return float(hit.sum() / top_full.sum())
+    codes, _ = pd.factorize(np.asarray(groups))
+    return float(np.mean(np.bincount(codes, weights=hit) / np.bincount(codes, weights=top_full)))
+
+def calibrate_keep_rate(model, prefilter, df: pd.DataFrame, k=10, target_recall=0.99,
+                        rates=(0.05, 0.1, 0.2, 0.3, 0.5), min_keep=20, by=None):
+    """Menor keep_rate cuja recall@k medida contra o scoring completo atinge o alvo
+    (1.0 = sem poda, se nenhuma taxa atingir)."""
+    groups = None if by is None else df[by]
+    full = predict_ranking(model, align_features(model, df))
+    for rate in sorted(rates):
+        scores, _ = predict_cascade(model, prefilter, df, rate, min_keep, by)
+        if topk_recall(full, scores, groups, k) >= target_recall:
+            return rate
+    return 1.0
+
+def benchmark_cascade(model, df: pd.DataFrame, rates=(0.05, 0.1, 0.2, 0.3, 0.5),
+                      ks=(10, 100), min_keep=20, by=None, n_repeats=5) -> pd.DataFrame:
+    """Throughput e recall@k da cascata contra o scoring completo, por keep_rate."""
+    import time
+
+    def timed(fn):
+        times = []
+        for _ in range(n_repeats):
+            t0 = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - t0)
+        return out, float(np.median(times))
+
+    groups = None if by is None else df[by]
+    prefilter = fit_prefilter(model, df)
+    full, t_full = timed(lambda: predict_ranking(model, align_features(model, df)))
+
+    rows = [{"keep_rate": 1.0, "pares_pontuados": 1.0, "tempo_ms": t_full * 1000,
+             "pares_por_s": len(df) / t_full, "speedup": 1.0, **{f"recall@{k}": 1.0 for k in ks}}]
+    for rate in rates:
+        (scores, scored), t = timed(lambda: predict_cascade(model, prefilter, df, rate, min_keep, by))
+        rows.append({"keep_rate": rate, "pares_pontuados": scored.mean(), "tempo_ms": t * 1000,
+                     "pares_por_s": len(df) / t, "speedup": t_full / t,
+                     **{f"recall@{k}": topk_recall(full, scores, groups, k) for k in ks}})
+
+    result = pd.DataFrame(rows)
+    escopo = "base inteira" if by is None else f"por {by}"
+    print(f"\n=== CASCATA ({len(df)} pares, {escopo}, min_keep={min_keep}) ===")
+    print(result.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    return result
@@ -92,15 +92,20 @@ def clean_dataframe(df):
     
     return df
 
-def create_basic_features(df):
-    """Cria features básicas a partir dos dados."""
+def cv_length(df):
+    """Tamanho do CV em caracteres."""
+    len_cv = df.get("cv_pt","").astype(str).str.len()
+    return pd.to_numeric(len_cv, errors="coerce").fillna(0)
+
+def create_basic_features(df, scaler=None):
+    """Cria features básicas a partir dos dados (scaler já ajustado é reutilizado)."""
     # Tamanho do CV
-    df["len_cv_pt"] = df.get("cv_pt","").astype(str).str.len()
-    df["len_cv_pt"] = pd.to_numeric(df["len_cv_pt"], errors="coerce").fillna(0)
+    df["len_cv_pt"] = cv_length(df)
     
     # Normalização Z-score
-    scaler = StandardScaler()
-    df["len_cv_pt_z"] = scaler.fit_transform(df[["len_cv_pt"]]).astype(np.float32)
+    if scaler is None:
+        scaler = StandardScaler().fit(df[["len_cv_pt"]])
+    df["len_cv_pt_z"] = scaler.transform(df[["len_cv_pt"]]).astype(np.float32)
     
     return df.drop(columns=["len_cv_pt"], errors="ignore")
 
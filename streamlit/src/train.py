@@ -3,20 +3,25 @@ Módulo de treinamento do modelo para o projeto Decision AI.
 Executa o pipeline completo de treinamento com validação cruzada.
 """
 
+import time
+
 import pandas as pd
 import numpy as np
 from lightgbm import LGBMClassifier
 from lightgbm.callback import early_stopping, log_evaluation
 from sklearn.model_selection import GroupKFold
 from sklearn.metrics import roc_auc_score, average_precision_score
-import joblib
-from pathlib import Path
 
 from preprocessing import preprocess_data
 from feature_engineering import engineer_features, get_final_features
+from model_registry import REGISTRY_DIR, register_model, promote
+from ensemble import ForestEnsemble
+
+def load_and_prepare_data(vagas_path, prospects_path, applicants_path, extra_cols=()):
+    """Carrega e prepara dados para treinamento.
 
-def load_and_prepare_data(vagas_path, prospects_path, applicants_path):
-    """Carrega e prepara dados para treinamento."""
+    extra_cols: colunas auxiliares mantidas ao lado das features (ex.: dt_cand no backtest).
+    """
     print("Carregando e processando dados...")
     
     # Pré-processamento
@@ -29,13 +34,45 @@ def load_and_prepare_data(vagas_path, prospects_path, applicants_path):
     keys = ["vaga_id", "codigo_candidato"]
     features = get_final_features()
     
-    df_final = pd.concat([df[keys], df[features]], axis=1)
+    df_final = pd.concat([df[keys], df[features], df[list(extra_cols)]], axis=1)
     
     print(f"Dataset preparado: {df_final.shape}")
     return df_final
 
-def train_model(df, n_folds=5):
-    """Treina modelo com validação cruzada."""
+def downsample_negatives(y, groups, rate, seed=42):
+    """Amostra negativos por vaga mantendo todos os positivos.
+
+    Retorna (índices mantidos, pesos). Cada negativo mantido recebe peso
+    n_neg / n_mantidos da sua vaga, preservando a calibração de predict_proba.
+    """
+    y = np.asarray(y)
+    codes, uniques = pd.factorize(pd.Series(groups).astype(str))
+    neg = np.flatnonzero(y == 0)
+    neg_codes = codes[neg]
+
+    # posição aleatória de cada negativo dentro da sua vaga
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(neg)), neg_codes))
+    n_neg = np.bincount(neg_codes, minlength=len(uniques))
+    starts = np.concatenate([[0], np.cumsum(n_neg)[:-1]])
+    rank = np.empty(len(neg), dtype=np.int64)
+    rank[order] = np.arange(len(neg)) - starts[neg_codes[order]]
+
+    # ao menos um negativo por vaga que tenha negativos
+    n_keep = np.ceil(n_neg * rate).astype(np.int64)
+    kept_neg = neg[rank < n_keep[neg_codes]]
+
+    weights = np.ones(len(y), dtype=np.float64)
+    weights[kept_neg] = n_neg[codes[kept_neg]] / n_keep[codes[kept_neg]]
+    keep = np.sort(np.concatenate([np.flatnonzero(y != 0), kept_neg]))
+    return keep, weights[keep]
+
+def cross_validate(df, n_folds=5, neg_sample_rate=None):
+    """Treina um modelo por fold (GroupKFold por vaga); retorna (modelos, aucs, aps).
+
+    neg_sample_rate: fração de negativos mantida por vaga no treino de cada fold
+    (None = todos). A validação sempre usa o fold completo.
+    """
     print("Iniciando treinamento...")
     
     # Preparar dados
@@ -64,6 +101,15 @@ def train_model(df, n_folds=5):
         
         X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
         
+        # Downsampling de negativos com pesos de correção
+        sample_weight = None
+        if neg_sample_rate is not None and neg_sample_rate < 1:
+            keep, sample_weight = downsample_negatives(
+                y_train, df["vaga_id"].iloc[train_idx], neg_sample_rate, seed=42 + fold
+            )
+            X_train, y_train = X_train.iloc[keep], y_train.iloc[keep]
+            print(f"Downsampling: {len(keep)} de {len(train_idx)} linhas de treino mantidas")
+        
         # Treinar modelo
         model = LGBMClassifier(
             objective="binary",
@@ -76,6 +122,7 @@ def train_model(df, n_folds=5):
         model.fit(
             X_train,
             y_train,
+            sample_weight=sample_weight,
             eval_set=[(X_val, y_val)],
             eval_metric=["auc", "average_precision"],
             callbacks=[early_stopping(stopping_rounds=50), log_evaluation(period=50)],
@@ -88,6 +135,7 @@ def train_model(df, n_folds=5):
         pr = average_precision_score(y_val, y_pred)
         
         print(f"ROC AUC: {auc:.4f}, Average Precision: {pr:.4f}")
+        print(f"Prob. média prevista: {y_pred.mean():.4f} (taxa real: {y_val.mean():.4f})")
         
         auc_scores.append(auc)
         pr_scores.append(pr)
@@ -98,30 +146,72 @@ def train_model(df, n_folds=5):
     print(f"Mean ROC AUC: {np.mean(auc_scores):.4f} ± {np.std(auc_scores):.4f}")
     print(f"Mean Average Precision: {np.mean(pr_scores):.4f} ± {np.std(pr_scores):.4f}")
     
+    return models, auc_scores, pr_scores
+
+def train_model(df, n_folds=5, neg_sample_rate=None, ensemble=False):
+    """Treina modelo com validação cruzada.
+
+    ensemble=True mantém todos os folds, fundidos em uma única floresta
+    (ForestEnsemble); caso contrário retorna o fold de maior AUC.
+    """
+    models, auc_scores, pr_scores = cross_validate(df, n_folds, neg_sample_rate)
+    
+    if ensemble:
+        return ForestEnsemble(models), auc_scores, pr_scores
+    
     # Retornar melhor modelo
     best_idx = np.argmax(auc_scores)
     best_model = models[best_idx]
     
     return best_model, auc_scores, pr_scores
 
-def save_model(model, model_path):
-    """Salva modelo treinado."""
-    Path(model_path).parent.mkdir(exist_ok=True)
-    joblib.dump(model, model_path)
-    print(f"Modelo salvo em: {model_path}")
+def compare_downsampling(df, rates=(0.5, 0.25, 0.1), n_folds=5):
+    """Compara tempo e AUC/AP do treino com downsampling contra o treino completo."""
+    rows = []
+    for rate in (None,) + tuple(rates):
+        t0 = time.perf_counter()
+        _, auc_scores, pr_scores = train_model(df, n_folds=n_folds, neg_sample_rate=rate)
+        rows.append({
+            "neg_sample_rate": 1.0 if rate is None else rate,
+            "tempo_s": time.perf_counter() - t0,
+            "auc": np.mean(auc_scores),
+            "ap": np.mean(pr_scores),
+        })
+
+    result = pd.DataFrame(rows)
+    base = result.iloc[0]
+    result["speedup"] = base["tempo_s"] / result["tempo_s"]
+    result["delta_auc"] = result["auc"] - base["auc"]
+    result["delta_ap"] = result["ap"] - base["ap"]
+
+    print("\n=== DOWNSAMPLING DE NEGATIVOS vs. TREINO COMPLETO ===")
+    print(result.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    return result
+
+def save_model(model, auc_scores=None, pr_scores=None, registry_dir=REGISTRY_DIR, promote_model=True):
+    """Registra o modelo como nova versão no registry (nunca sobrescreve) e promove."""
+    metrics = {}
+    if auc_scores:
+        metrics.update(auc_mean=np.mean(auc_scores), auc_std=np.std(auc_scores))
+    if pr_scores:
+        metrics.update(pr_mean=np.mean(pr_scores), pr_std=np.std(pr_scores))
+
+    version = register_model(model, metrics=metrics, registry_dir=registry_dir)
+    if promote_model:
+        promote(version, registry_dir)
+    return version
 
-def main():
+def main(neg_sample_rate=None, ensemble=False):
     """Pipeline principal de treinamento."""
     # Caminhos
     vagas_path = "data/vagas.json"
     prospects_path = "data/prospects.json"
     applicants_path = "data/applicants.json"
-    model_path = "models/model_lgbm.pkl"
     
     # Executar pipeline
     df = load_and_prepare_data(vagas_path, prospects_path, applicants_path)
-    model, auc_scores, pr_scores = train_model(df)
-    save_model(model, model_path)
+    model, auc_scores, pr_scores = train_model(df, neg_sample_rate=neg_sample_rate, ensemble=ensemble)
+    save_model(model, auc_scores, pr_scores)
     
     print("\n✅ Treinamento concluído com sucesso!")
     
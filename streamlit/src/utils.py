@@ -1,5 +1,6 @@
 # streamlit/src/utils.py
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 def _resolve(p: str | Path) -> Path:
@@ -23,12 +24,22 @@ def get_status_color(situacao_ord: int) -> str:
     colors = {0: "gray", 1: "blue", 2: "orange", 3: "purple", 4: "green", 5: "gold", 6: "red"}
     return colors.get(situacao_ord, "gray")
 
-def calculate_metrics_summary(df: pd.DataFrame):
-    total_candidatos = len(df)
-    total_vagas = df["vaga_id"].nunique()
-    taxa_contratacao = (df["situacao_ord"] == 5).mean() * 100
+N_STAGES = 7  # situacao_ord: 0 (cadastrado) .. 6 (reprovado)
+
+def summarize_stage_counts(stage_counts, total_vagas: int):
+    # mesmo resumo de calculate_metrics_summary, a partir das contagens por etapa do funil
+    stage_counts = np.asarray(stage_counts, dtype=np.int64)
+    total_candidatos = int(stage_counts.sum())
+    taxa_contratacao = stage_counts[5] / total_candidatos * 100 if total_candidatos else 0.0
     return {
         "total_candidatos": total_candidatos,
-        "total_vagas": total_vagas,
+        "total_vagas": int(total_vagas),
         "taxa_contratacao": taxa_contratacao,
+        "funil": stage_counts,
     }
+
+def calculate_metrics_summary(df: pd.DataFrame):
+    # mesmo tratamento de build_cube: sem status = encaminhado; fora da faixa é truncado
+    stages = np.clip(df["situacao_ord"].fillna(2).astype(int).to_numpy(), 0, N_STAGES - 1)
+    stage_counts = np.bincount(stages, minlength=N_STAGES)
+    return summarize_stage_counts(stage_counts, df["vaga_id"].nunique())